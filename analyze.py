@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Analyse en lot de parties PGN, sans interface.
+
+Les parties sont lues une à une dans le fichier PGN et réparties entre des
+processus de calcul ; chaque position est évaluée par ``ChessAI`` et une
+ligne par coup (évaluation, meilleur coup, coup joué) est écrite en JSONL
+ou en CSV. Le score est en centipions, positif à l'avantage des blancs.
+
+    python analyze.py parties.pgn --output analyse.jsonl --depth 3 --workers 4
+    python analyze.py parties.pgn --output analyse.csv --time-limit 0.5
+    python analyze.py parties.pgn --output analyse.jsonl --resume
+
+Reprise : après chaque partie écrite, son numéro et la taille du fichier de
+sortie sont ajoutés à ``<sortie>.progress``. Avec ``--resume``, la sortie
+est tronquée à la dernière partie complète et les parties déjà analysées
+sont sautées.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Set, TextIO, Tuple
+
+from chess_ai import ChessAI
+from parallel import init_worker, worker_ai
+from pgn import PgnGame, move_to_san, read_games
+from perft import move_name
+
+FIELDS = ("game", "ply", "white", "black", "fen", "move", "best_move", "best_uci",
+          "score", "depth", "nodes", "time")
+
+def analyze_game(index: int, game: PgnGame, depth: int,
+                 time_limit: Optional[float]) -> Tuple[int, List[Dict], Optional[str]]:
+    """Lignes d'analyse d'une partie, et le message d'erreur si elle s'arrête avant la fin.
+
+    Exécutée dans un processus préparé par parallel.init_worker.
+    """
+    ai = worker_ai()
+    ai.new_game()
+    rows, error = [], None
+    try:
+        for ply, (board, move) in enumerate(game.replay()):
+            rows.append(_analyze_position(ai, index, ply, game, board, move, depth, time_limit))
+    except ValueError as exc:
+        error = str(exc)
+    return index, rows, error
+
+def _analyze_position(ai: ChessAI, index: int, ply: int, game: PgnGame, board, move,
+                      depth: int, time_limit: Optional[float]) -> Dict:
+    fen = board.to_fen()
+    played = move_to_san(board, move)
+    score, best = ai.iterative_deepening(board, depth, time_limit)
+    info = ai.last_search_info
+    return {
+        "game": index,
+        "ply": ply,
+        "white": game.headers.get("White", "?"),
+        "black": game.headers.get("Black", "?"),
+        "fen": fen,
+        "move": played,
+        "best_move": move_to_san(board, best) if best is not None else None,
+        "best_uci": move_name(best) if best is not None else None,
+        # L'IA compte positivement l'avantage des noirs
+        "score": -score,
+        "depth": info.get("depth", 0),
+        "nodes": info.get("nodes", 0),
+        "time": round(info.get("time", 0), 4),
+    }
+
+def read_progress(path: str) -> Tuple[Set[int], int]:
+    """Parties terminées et taille de la sortie après la dernière d'entre elles"""
+    done, size = set(), 0
+    if not os.path.exists(path):
+        return done, size
+    with open(path, encoding="utf-8") as stream:
+        for line in stream:
+            fields = line.split()
+            # Une dernière ligne incomplète (interruption) est ignorée
+            if len(fields) == 2 and line.endswith("\n"):
+                done.add(int(fields[0]))
+                size = max(size, int(fields[1]))
+    return done, size
+
+def pending_games(path: str, done: Set[int], limit: Optional[int]) -> Iterator[Tuple[int, PgnGame]]:
+    with open(path, encoding="utf-8", errors="replace") as stream:
+        for index, game in enumerate(islice(read_games(stream), limit)):
+            if index not in done:
+                yield index, game
+
+class ResultWriter:
+    """Écrit les lignes d'une partie d'un bloc, puis enregistre la progression"""
+
+    def __init__(self, path: str, output_format: str, resume: bool):
+        self.progress_path = path + ".progress"
+        self.done, size = read_progress(self.progress_path) if resume else (set(), 0)
+        self.stream: TextIO = open(path, "a+" if resume else "w", encoding="utf-8", newline="")
+        if resume:
+            # Lignes d'une partie interrompue en cours d'écriture
+            self.stream.truncate(size)
+            self.stream.seek(size)
+        self.progress = open(self.progress_path, "a" if resume else "w", encoding="utf-8")
+        self.csv = None
+        if output_format == "csv":
+            self.csv = csv.DictWriter(self.stream, FIELDS)
+            if size == 0:
+                self.csv.writeheader()
+
+    def write(self, index: int, rows: List[Dict]):
+        for row in rows:
+            if self.csv is not None:
+                self.csv.writerow(row)
+            else:
+                self.stream.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self.stream.flush()
+        os.fsync(self.stream.fileno())
+        self.progress.write(f"{index} {self.stream.tell()}\n")
+        self.progress.flush()
+        self.done.add(index)
+
+    def close(self):
+        self.stream.close()
+        self.progress.close()
+
+def run_analysis(pgn_path: str, output: str, output_format: str, depth: int,
+                 time_limit: Optional[float], workers: int, hash_size_mb: float = 16,
+                 resume: bool = False, limit: Optional[int] = None) -> int:
+    """Analyse les parties du fichier, retourne le nombre de parties écrites"""
+    writer = ResultWriter(output, output_format, resume)
+    games = pending_games(pgn_path, set(writer.done), limit)
+    # Parties en cours limitées : le fichier n'est lu qu'au rythme de l'analyse
+    max_pending = workers * 2
+    written, positions, start = 0, 0, time.time()
+    pool = ProcessPoolExecutor(workers, initializer=init_worker, initargs=(depth, hash_size_mb))
+    pending = set()
+    try:
+        pending = {pool.submit(analyze_game, index, game, depth, time_limit) for index, game in islice(games, max_pending)}
+        while pending:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                index, rows, error = future.result()
+                writer.write(index, rows)
+                written += 1
+                positions += len(rows)
+                if error is not None:
+                    print(f"\npartie {index} : analyse arrêtée au coup {len(rows) + 1} ({error})",
+                          file=sys.stderr)
+            pending |= {pool.submit(analyze_game, index, game, depth, time_limit)
+                        for index, game in islice(games, len(finished))}
+            elapsed = time.time() - start
+            print(f"\r{written} parties, {positions} positions, {elapsed:.0f} s",
+                  end="", file=sys.stderr, flush=True)
+    finally:
+        # Interruption : les parties en attente sont abandonnées, --resume les reprendra
+        # (annulées une à une : shutdown(cancel_futures=True) demande Python 3.9)
+        for future in pending:
+            future.cancel()
+        pool.shutdown(wait=True)
+        writer.close()
+        print(file=sys.stderr)
+    return written
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyse en lot de parties PGN")
+    parser.add_argument("pgn", help="fichier PGN à analyser")
+    parser.add_argument("--output", required=True, help="fichier de sortie (.jsonl ou .csv)")
+    parser.add_argument("--format", choices=("jsonl", "csv"),
+                        help="format de sortie (déduit de l'extension par défaut)")
+    parser.add_argument("--depth", type=int, default=3, help="profondeur de recherche par position")
+    parser.add_argument("--time-limit", type=float, help="budget par position (s), jusqu'à --depth")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processus de calcul")
+    parser.add_argument("--hash", type=float, default=16, help="table de transposition par processus (Mo)")
+    parser.add_argument("--limit", type=int, help="nombre maximal de parties lues")
+    parser.add_argument("--resume", action="store_true", help="reprendre une analyse interrompue")
+    args = parser.parse_args()
+
+    output_format = args.format or ("csv" if args.output.endswith(".csv") else "jsonl")
+    run_analysis(args.pgn, args.output, output_format, args.depth, args.time_limit,
+                 args.workers, args.hash, args.resume, args.limit)
+
+if __name__ == "__main__":
+    main()
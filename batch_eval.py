@@ -0,0 +1,39 @@
+"""
+Évaluation vectorisée d'un lot de positions avec NumPy.
+
+Les positions sont encodées en plans de pièces : un tableau (N, 12, 64)
+de 0 et de 1, un plan par couple (couleur, type) dans l'ordre des
+bitboards (blancs puis noirs, pion à roi). Le score matériel et positionnel
+de ``ChessAI.material_score`` devient alors un seul produit matriciel avec
+les tables ``piece_square_values`` aplaties en un vecteur de 768 poids.
+
+    planes = encode_boards(boards)
+    scores = evaluate_planes(planes, piece_square_weights(ai))
+
+Les scores sont absolus (positifs pour les noirs), comme ceux de l'IA.
+"""
+
+from itertools import chain
+from typing import Sequence
+
+import numpy as np
+
+from chess_engine import ChessBoard
+
+PLANES = 12
+
+def encode_boards(boards: Sequence[ChessBoard]) -> np.ndarray:
+    """Plans de pièces (N, 12, 64) en uint8, case i = bit i des bitboards"""
+    bitboards = np.fromiter(chain.from_iterable(chain.from_iterable(board.pieces) for board in boards),
+                            dtype="<u8", count=len(boards) * PLANES)
+    bits = np.unpackbits(bitboards.view(np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+    return bits.reshape(len(boards), PLANES, 64)
+
+def piece_square_weights(ai) -> np.ndarray:
+    """Poids (12, 64) : valeur et bonus de position signés de chaque pièce sur chaque case"""
+    return np.array([table for side in ai.piece_square_values for table in side], dtype=np.int32)
+
+def evaluate_planes(planes: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """Scores (N,) des positions encodées, en une seule opération sur le lot"""
+    # einsum accumule en int32 sans convertir d'abord les plans uint8
+    return np.einsum("nk,k->n", planes.reshape(len(planes), PLANES * 64), weights.reshape(-1))
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Banc d'essai de la recherche de l'IA.
+
+Lance ``ChessAI.minimax`` (profondeur fixe, table vide) et
+``ChessAI.get_best_move`` (approfondissement itératif) sur un jeu fixe de
+positions, pour chaque niveau de difficulté, et écrit les mesures en JSON
+pour comparer les versions entre elles.
+
+    python benchmark.py --max-difficulty 3 --output bench.json
+    python benchmark.py --output new.json --compare bench.json
+    python benchmark.py --without lmr --without null_move   # options de recherche désactivées
+"""
+
+import argparse
+import json
+import math
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from chess_ai import ChessAI
+from chess_engine import ChessBoard, Color
+from perft import move_name
+
+# Positions avec les noirs au trait (l'IA joue les noirs)
+BENCH_POSITIONS = [
+    ("italienne", "middlegame",
+     "r1bqkbnr/pppp1ppp/2n5/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R b KQkq - 3 3"),
+    ("gambit dame", "middlegame",
+     "rnbqkbnr/ppp2ppp/4p3/3p4/2PP4/2N5/PP2PPPP/R1BQKBNR b KQkq - 1 3"),
+    ("kiwipete", "middlegame",
+     "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R b KQkq - 0 1"),
+    ("tours et pions", "endgame",
+     "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 b - - 0 1"),
+    ("dame contre roi", "endgame",
+     "8/8/3q4/4k3/8/8/8/4K3 b - - 0 1"),
+    ("finale de tours", "endgame",
+     "8/5pk1/8/8/8/8/1r3PK1/4R3 b - - 0 1"),
+]
+
+# Options de recherche de ChessAI (paramètres use_<option>)
+SEARCH_OPTIONS = ("mobility", "quiescence", "pvs", "null_move", "lmr")
+
+def _search_stats(ai: ChessAI, depth: int, elapsed: float) -> Dict:
+    nodes = ai.nodes
+    return {
+        "depth": depth,
+        "nodes": nodes,
+        "time": round(elapsed, 4),
+        "nodes_per_second": round(nodes / elapsed) if elapsed > 0 else 0,
+        # Facteur de branchement effectif : nœuds ** (1 / profondeur)
+        "branching_factor": round(nodes ** (1 / depth), 3) if depth > 0 and nodes > 0 else 0,
+        "quiescence_nodes": ai.quiescence_nodes,
+        "cutoffs": ai.cutoffs,
+        "cutoff_rate": round(ai.cutoffs / ai.interior_nodes, 4) if ai.interior_nodes else 0,
+        "first_move_cutoff_rate": round(ai.first_move_cutoffs / ai.cutoffs, 4) if ai.cutoffs else 0,
+    }
+
+def bench_minimax(fen: str, difficulty: int, options: Optional[Dict[str, bool]] = None) -> Dict:
+    """Une recherche minimax à profondeur fixe, table de transposition vide"""
+    board = ChessBoard.from_fen(fen)
+    ai = ChessAI(difficulty, **(options or {}))
+    ai.reset_stats()
+    start = time.perf_counter()
+    maximizing = board.current_player == Color.BLACK
+    score, move = ai.minimax(board, difficulty, -math.inf, math.inf, maximizing)
+    elapsed = time.perf_counter() - start
+    result = _search_stats(ai, difficulty, elapsed)
+    result.update(score=score, best_move=move_name(move) if move else None)
+    return result
+
+def bench_best_move(fen: str, difficulty: int, time_limit: Optional[float],
+                    options: Optional[Dict[str, bool]] = None) -> Dict:
+    """Un appel à get_best_move, avec ou sans budget de temps"""
+    board = ChessBoard.from_fen(fen)
+    ai = ChessAI(difficulty, **(options or {}))
+    start = time.perf_counter()
+    move = ai.get_best_move(board, time_limit=time_limit)
+    elapsed = time.perf_counter() - start
+    result = _search_stats(ai, ai.last_search_info.get("depth", 0), elapsed)
+    result.update(score=ai.last_search_info.get("score"), best_move=move_name(move) if move else None)
+    return result
+
+def run_benchmark(max_difficulty: int, time_limit: Optional[float] = None,
+                  options: Optional[Dict[str, bool]] = None) -> List[Dict]:
+    results = []
+    for name, phase, fen in BENCH_POSITIONS:
+        for difficulty in range(1, max_difficulty + 1):
+            for mode in ("minimax", "get_best_move"):
+                if mode == "minimax":
+                    stats = bench_minimax(fen, difficulty, options)
+                else:
+                    stats = bench_best_move(fen, difficulty, time_limit, options)
+                entry = {"position": name, "phase": phase, "mode": mode, "difficulty": difficulty}
+                entry.update(stats)
+                results.append(entry)
+                print(f"{name:16} {mode:13} niv. {difficulty}  prof. {stats['depth']}  "
+                      f"{stats['nodes']:>8} nœuds  {stats['nodes_per_second']:>7} n/s  "
+                      f"b={stats['branching_factor']:<6} coupures {stats['cutoff_rate']:.0%}  "
+                      f"{stats['time']:.2f} s  {stats['best_move']}")
+    return results
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results: List[Dict], baseline: List[Dict]):
+    """Affiche le rapport des temps et des nœuds par rapport à une exécution précédente"""
+    previous = {(r["position"], r["mode"], r["difficulty"]): r for r in baseline}
+    for result in results:
+        old = previous.get((result["position"], result["mode"], result["difficulty"]))
+        if old is None or not old["time"] or not old["nodes"]:
+            continue
+        print(f"{result['position']:16} {result['mode']:13} niv. {result['difficulty']}  "
+              f"temps x{result['time'] / old['time']:.2f}  nœuds x{result['nodes'] / old['nodes']:.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Banc d'essai de la recherche de l'IA")
+    parser.add_argument("--max-difficulty", type=int, default=3, help="niveaux testés : 1 à N")
+    parser.add_argument("--time-limit", type=float, help="budget par coup pour get_best_move (s)")
+    parser.add_argument("--output", help="fichier JSON des résultats")
+    parser.add_argument("--compare", help="fichier JSON d'une exécution précédente")
+    parser.add_argument("--without", action="append", default=[], choices=SEARCH_OPTIONS,
+                        help="option de recherche désactivée (répétable)")
+    args = parser.parse_args()
+
+    options = {f"use_{name}": name not in args.without for name in SEARCH_OPTIONS}
+    results = run_benchmark(args.max_difficulty, args.time_limit, options)
+    report = {
+        "date": datetime.now(timezone.utc).isoformat(),
+        "revision": _git_revision(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "options": options,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(results, json.load(f)["results"])
+
+if __name__ == "__main__":
+    main()
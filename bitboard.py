@@ -0,0 +1,181 @@
+"""
+Bitboards 64 bits pour la représentation du plateau.
+
+La case (row, col) correspond au bit row * 8 + col : la ligne 0 est celle des
+pièces noires, comme dans l'interface graphique.
+"""
+
+from typing import Iterator, List
+
+FULL = (1 << 64) - 1
+
+FILE_A = 0x0101010101010101
+FILE_H = FILE_A << 7
+NOT_FILE_A = FULL ^ FILE_A
+NOT_FILE_H = FULL ^ FILE_H
+NOT_FILE_AB = NOT_FILE_A & (FULL ^ (FILE_A << 1))
+NOT_FILE_GH = NOT_FILE_H & (FULL ^ (FILE_H >> 1))
+
+RANK_MASKS = [0xFF << (8 * row) for row in range(8)]
+
+# Cases blanches (a8 est blanche), pour les fous de même couleur
+LIGHT_SQUARES = sum(1 << sq for sq in range(64) if (sq // 8 + sq % 8) % 2 == 0)
+
+def square(row: int, col: int) -> int:
+    """Retourne l'indice 0-63 d'une case"""
+    return row * 8 + col
+
+def bit(row: int, col: int) -> int:
+    """Retourne le masque d'une case"""
+    return 1 << (row * 8 + col)
+
+def iter_squares(bb: int) -> Iterator[int]:
+    """Parcourt les indices des bits à 1 d'un bitboard"""
+    while bb:
+        lsb = bb & -bb
+        yield lsb.bit_length() - 1
+        bb ^= lsb
+
+def squares(bb: int) -> List[int]:
+    """Retourne la liste des indices des bits à 1"""
+    result = []
+    while bb:
+        lsb = bb & -bb
+        result.append(lsb.bit_length() - 1)
+        bb ^= lsb
+    return result
+
+def popcount(bb: int) -> int:
+    return bin(bb).count("1")
+
+# Décalages élémentaires ("nord" = vers la ligne 0, sens de marche des blancs)
+def north(bb: int) -> int:
+    return bb >> 8
+
+def south(bb: int) -> int:
+    return (bb << 8) & FULL
+
+def east(bb: int) -> int:
+    return (bb << 1) & NOT_FILE_A
+
+def west(bb: int) -> int:
+    return (bb >> 1) & NOT_FILE_H
+
+def north_east(bb: int) -> int:
+    return (bb >> 7) & NOT_FILE_A
+
+def north_west(bb: int) -> int:
+    return (bb >> 9) & NOT_FILE_H
+
+def south_east(bb: int) -> int:
+    return (bb << 9) & NOT_FILE_A & FULL
+
+def south_west(bb: int) -> int:
+    return (bb << 7) & NOT_FILE_H & FULL
+
+ROOK_SHIFTS = (north, south, east, west)
+BISHOP_SHIFTS = (north_east, north_west, south_east, south_west)
+
+def knight_attacks(bb: int) -> int:
+    """Cases attaquées par les cavaliers d'un bitboard"""
+    return (((bb >> 17) & NOT_FILE_H) | ((bb >> 15) & NOT_FILE_A) |
+            ((bb >> 10) & NOT_FILE_GH) | ((bb >> 6) & NOT_FILE_AB) |
+            ((bb << 6) & NOT_FILE_GH) | ((bb << 10) & NOT_FILE_AB) |
+            ((bb << 15) & NOT_FILE_H) | ((bb << 17) & NOT_FILE_A)) & FULL
+
+def king_attacks(bb: int) -> int:
+    """Cases attaquées par les rois d'un bitboard"""
+    row = bb | east(bb) | west(bb)
+    return (row | north(row) | south(row)) ^ bb
+
+def pawn_attacks(bb: int, white: bool) -> int:
+    """Cases attaquées en diagonale par les pions d'un bitboard"""
+    if white:
+        return north_east(bb) | north_west(bb)
+    return south_east(bb) | south_west(bb)
+
+# Tables précalculées à l'import (quelques milliers d'opérations) :
+# attaques par case des cavaliers, rois et pions, et rayons par direction
+KNIGHT_ATTACKS = [knight_attacks(1 << sq) for sq in range(64)]
+KING_ATTACKS = [king_attacks(1 << sq) for sq in range(64)]
+PAWN_ATTACKS = [[pawn_attacks(1 << sq, white) for sq in range(64)] for white in (True, False)]
+
+def _rays(shift) -> List[int]:
+    """Cases de chaque case jusqu'au bord, dans une direction, plateau vide"""
+    rays = []
+    for sq in range(64):
+        ray, bb = 0, shift(1 << sq)
+        while bb:
+            ray |= bb
+            bb = shift(bb)
+        rays.append(ray)
+    return rays
+
+# Indices décroissants vers le nord et l'ouest, croissants vers le sud et l'est
+NORTH_RAYS, SOUTH_RAYS = _rays(north), _rays(south)
+EAST_RAYS, WEST_RAYS = _rays(east), _rays(west)
+NORTH_EAST_RAYS, NORTH_WEST_RAYS = _rays(north_east), _rays(north_west)
+SOUTH_EAST_RAYS, SOUTH_WEST_RAYS = _rays(south_east), _rays(south_west)
+RAYS = (NORTH_RAYS, SOUTH_RAYS, EAST_RAYS, WEST_RAYS,
+        NORTH_EAST_RAYS, NORTH_WEST_RAYS, SOUTH_EAST_RAYS, SOUTH_WEST_RAYS)
+
+def rook_attacks(sq: int, occupied: int) -> int:
+    """Cases attaquées par une tour en sq, arrêtées par la première pièce.
+
+    Chaque rayon est coupé après le premier bloqueur : le bit de poids fort
+    vers les indices décroissants, le bit de poids faible vers les croissants.
+    """
+    attacks = NORTH_RAYS[sq]
+    blockers = attacks & occupied
+    if blockers:
+        attacks ^= NORTH_RAYS[blockers.bit_length() - 1]
+    ray = WEST_RAYS[sq]
+    blockers = ray & occupied
+    if blockers:
+        ray ^= WEST_RAYS[blockers.bit_length() - 1]
+    attacks |= ray
+    ray = SOUTH_RAYS[sq]
+    blockers = ray & occupied
+    if blockers:
+        ray ^= SOUTH_RAYS[(blockers & -blockers).bit_length() - 1]
+    attacks |= ray
+    ray = EAST_RAYS[sq]
+    blockers = ray & occupied
+    if blockers:
+        ray ^= EAST_RAYS[(blockers & -blockers).bit_length() - 1]
+    return attacks | ray
+
+def bishop_attacks(sq: int, occupied: int) -> int:
+    """Cases attaquées par un fou en sq, arrêtées par la première pièce"""
+    attacks = NORTH_EAST_RAYS[sq]
+    blockers = attacks & occupied
+    if blockers:
+        attacks ^= NORTH_EAST_RAYS[blockers.bit_length() - 1]
+    ray = NORTH_WEST_RAYS[sq]
+    blockers = ray & occupied
+    if blockers:
+        ray ^= NORTH_WEST_RAYS[blockers.bit_length() - 1]
+    attacks |= ray
+    ray = SOUTH_EAST_RAYS[sq]
+    blockers = ray & occupied
+    if blockers:
+        ray ^= SOUTH_EAST_RAYS[(blockers & -blockers).bit_length() - 1]
+    attacks |= ray
+    ray = SOUTH_WEST_RAYS[sq]
+    blockers = ray & occupied
+    if blockers:
+        ray ^= SOUTH_WEST_RAYS[(blockers & -blockers).bit_length() - 1]
+    return attacks | ray
+
+# Cases strictement entre deux cases alignées (0 sinon) : le rayon de a
+# privé de celui de b dans la même direction, et de b lui-même
+BETWEEN = [[0] * 64 for _ in range(64)]
+for _rays_of in RAYS:
+    for _a in range(64):
+        for _b in squares(_rays_of[_a]):
+            BETWEEN[_a][_b] = _rays_of[_a] ^ _rays_of[_b] ^ (1 << _b)
+del _rays_of, _a, _b
+
+def between(a: int, b: int) -> int:
+    """Cases strictement entre a et b si elles sont alignées, sinon 0"""
+    return BETWEEN[a][b]
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Bibliothèque d'ouvertures : fichier binaire trié, projeté en mémoire.
+
+Le fichier est un en-tête de 8 octets suivi d'entrées de 16 octets
+(clé de Zobrist sur 64 bits, coup encodé sur 32 bits, nombre de parties sur
+32 bits, gros-boutiste), triées par clé. La recherche est une dichotomie
+directement dans la projection mémoire (mmap) : plusieurs processus
+partagent les mêmes pages sans charger chacun une copie.
+
+    python book.py parties.pgn --output book.bin --plies 20 --min-count 2
+
+Les clés dépendent des clés de Zobrist de chess_engine : un changement de
+ces clés impose de reconstruire le fichier (l'en-tête porte une version).
+"""
+
+import argparse
+import mmap
+import random
+import struct
+import sys
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from chess_engine import ChessBoard, Move
+from pgn import parse_san, read_games
+
+BOOK_MAGIC = b"EEMBOOK\x02"
+_ENTRY = struct.Struct(">QII")
+
+class OpeningBook:
+    """Lecture d'une bibliothèque d'ouvertures.
+
+    ``choose`` retourne le coup le plus joué, ou un coup tiré au sort en
+    proportion des parties si ``random_choice`` est vrai.
+    """
+
+    def __init__(self, path: str, random_choice: bool = False, seed: Optional[int] = None):
+        with open(path, "rb") as stream:
+            self._mmap = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(BOOK_MAGIC)] != BOOK_MAGIC:
+            self._mmap.close()
+            raise ValueError(f"Bibliothèque d'ouvertures invalide ou d'une autre version : {path}")
+        self.size = (len(self._mmap) - len(BOOK_MAGIC)) // _ENTRY.size
+        self.random_choice = random_choice
+        self._random = random.Random(seed)
+
+    def _key_at(self, index: int) -> int:
+        return struct.unpack_from(">Q", self._mmap, len(BOOK_MAGIC) + index * _ENTRY.size)[0]
+
+    def entries(self, key: int) -> List[Tuple[Move, int]]:
+        """Coups connus pour une clé, avec leur nombre de parties"""
+        low, high = 0, self.size
+        while low < high:
+            middle = (low + high) // 2
+            if self._key_at(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        found = []
+        offset = len(BOOK_MAGIC) + low * _ENTRY.size
+        while low < self.size:
+            entry_key, move, count = _ENTRY.unpack_from(self._mmap, offset)
+            if entry_key != key:
+                break
+            found.append((move, count))
+            low += 1
+            offset += _ENTRY.size
+        return found
+
+    def choose(self, board: ChessBoard) -> Optional[Move]:
+        """Coup de la bibliothèque pour la position, ou None"""
+        entries = self.entries(board.zobrist_key)
+        # Vérifier la légalité : une collision de clés ne doit pas produire de coup faux
+        if not self.random_choice:
+            # Entrées triées par nombre de parties décroissant
+            return next((move for move, _ in entries if board.is_legal(move)), None)
+        legal = set(board.get_all_valid_moves(board.current_player)) if entries else ()
+        moves = [(move, count) for move, count in entries if move in legal]
+        if not moves:
+            return None
+        return self._random.choices([move for move, _ in moves], [count for _, count in moves])[0]
+
+    def close(self):
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def collect_positions(games: Iterable, plies: int,
+                      counts: Optional[Dict[Tuple[int, Move], int]] = None) -> Dict[Tuple[int, Move], int]:
+    """Nombre de parties par (clé, coup) sur les premiers demi-coups de chaque partie"""
+    counts = {} if counts is None else counts
+    for game in games:
+        board = game.start_board()
+        try:
+            for san in game.moves[:plies]:
+                move = parse_san(board, san)
+                counts[board.zobrist_key, move] = counts.get((board.zobrist_key, move), 0) + 1
+                board.push(move)
+        except ValueError:
+            continue  # Coup non reconnu : le début de partie déjà lu est conservé
+    return counts
+
+def write_book(path: str, counts: Dict[Tuple[int, Move], int], min_count: int = 1) -> int:
+    """Écrit le fichier trié par clé, coups les plus joués d'abord ; retourne le nombre d'entrées"""
+    entries = sorted(((key, move, count) for (key, move), count in counts.items() if count >= min_count),
+                     key=lambda entry: (entry[0], -entry[2]))
+    with open(path, "wb") as stream:
+        stream.write(BOOK_MAGIC)
+        for key, move, count in entries:
+            stream.write(_ENTRY.pack(key, move, min(count, 0xFFFFFFFF)))
+    return len(entries)
+
+def build_book(pgn_paths: List[str], output: str, plies: int = 20, min_count: int = 1) -> int:
+    counts: Dict[Tuple[int, Move], int] = {}
+    for pgn_path in pgn_paths:
+        with open(pgn_path, encoding="utf-8", errors="replace") as stream:
+            collect_positions(read_games(stream), plies, counts)
+    return write_book(output, counts, min_count)
+
+def main():
+    parser = argparse.ArgumentParser(description="Construction d'une bibliothèque d'ouvertures")
+    parser.add_argument("pgn", nargs="+", help="fichiers PGN sources")
+    parser.add_argument("--output", default="book.bin", help="fichier de la bibliothèque")
+    parser.add_argument("--plies", type=int, default=20, help="demi-coups retenus par partie")
+    parser.add_argument("--min-count", type=int, default=1, help="parties minimales par coup")
+    args = parser.parse_args()
+
+    count = build_book(args.pgn, args.output, args.plies, args.min_count)
+    print(f"{count} entrées écrites dans {args.output}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,104 @@
 import random
 import math
+import time
+import threading
 from typing import List, Tuple, Optional
-from chess_game import ChessBoard, Color, PieceType, Piece
+from chess_engine import (ChessBoard, Color, PieceType, Piece, PIECE_TYPES, Move,
+                          MOVE_CAPTURE, MOVE_EN_PASSANT, MOVE_PROMOTION_SHIFT, CASTLING_ROOKS,
+                          FIFTY_MOVE_PLIES, WHITE_IDX, BLACK_IDX, PAWN_IDX, ROOK_IDX, KING_IDX)
+from bitboard import popcount
+from transposition import TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+
+# Profondeur maximale d'une recherche limitée par un budget
+MAX_SEARCH_DEPTH = 64
+
+# Marge de l'élagage delta : une prise qui, même avec ce bonus, ne ramène pas
+# le score dans la fenêtre n'est pas cherchée
+DELTA_MARGIN = 200
+
+# Priorités du tri des coups : coup de la table, prises (MVV-LVA), coups
+# killer, puis coups calmes selon l'historique
+HASH_MOVE_SCORE = 1 << 30
+CAPTURE_SCORE = 1 << 24
+KILLER_SCORE = 1 << 22
+HISTORY_MAX = KILLER_SCORE - 100  # Reste sous les killers, bonus central compris
+
+# Score d'un mat (sans distance), pour le camp maté
+MATE_SCORE = 10000
+
+# Gain prouvé par les tables de finales, diminué de la distance au mat ;
+# en dessous de MATE_SCORE pour que l'approfondissement continue
+TABLEBASE_WIN = 9000
+
+# Coup nul : profondeur minimale et réduction
+NULL_MOVE_MIN_DEPTH = 3
+NULL_MOVE_REDUCTION = 2
+
+# Réduction des coups tardifs (LMR) : coups calmes au-delà du rang
+# LMR_MIN_INDEX, à partir de la profondeur LMR_MIN_DEPTH
+LMR_MIN_DEPTH = 3
+LMR_MIN_INDEX = 3
+
+# Taille des tampons de scores de coups (une position légale a au plus 218 coups)
+MAX_MOVES = 256
+
+# Bonus des coups calmes vers le centre, départage quand l'historique est vide
+CENTER_BONUS = [int((7 - abs(3.5 - sq // 8) - abs(3.5 - sq % 8)) * 10) for sq in range(64)]
+
+class SearchTimeout(Exception):
+    """Levée pendant la recherche quand le budget de temps ou de nœuds est épuisé"""
 
 class ChessAI:
-    def __init__(self, difficulty: int = 3):
+    def __init__(self, difficulty: int = 3, hash_size_mb: float = 16,
+                 time_limit: Optional[float] = None, node_limit: Optional[int] = None,
+                 use_mobility: bool = True, workers: int = 1, parallel_mode: str = "root",
+                 transposition_table=None, use_quiescence: bool = True, use_pvs: bool = True,
+                 use_null_move: bool = True, use_lmr: bool = True, book=None, tablebase=None):
         self.difficulty = difficulty  # Profondeur de recherche (1-5)
+        # Bibliothèque d'ouvertures (book.OpeningBook) consultée avant toute recherche
+        self.book = book
+        # Tables de finales (tablebase.Tablebases) consultées à la racine et aux feuilles
+        self.tablebase = tablebase
+        # Recherche multi-processus au-delà d'un processus (voir parallel.py)
+        self.workers = workers
+        self.parallel_mode = parallel_mode
+        self.hash_size_mb = hash_size_mb
+        self._parallel = None
+        # Terme de mobilité (coups pseudo-légaux) dans l'évaluation
+        self.use_mobility = use_mobility
+        # Prolonger les feuilles par les prises (recherche de repos)
+        self.use_quiescence = use_quiescence
+        # Options du cœur de la recherche, désactivables pour les comparer
+        self.use_pvs = use_pvs
+        self.use_null_move = use_null_move
+        self.use_lmr = use_lmr
+        # Budget par coup : sans budget, la recherche va jusqu'à la profondeur difficulty
+        self.time_limit = time_limit  # en secondes
+        self.node_limit = node_limit
+        # Statistiques de la dernière recherche (voir reset_stats)
+        self.nodes = 0
+        self.quiescence_nodes = 0
+        self.interior_nodes = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.last_search_info = {}
+        self._deadline = None
+        self._max_nodes = None
+        self._stop_event = None
+        self._check_budget = False
+        self._root_depth = 0
+        self._pv = []
+        # Coups calmes ayant provoqué une coupure : deux par demi-coup depuis la
+        # racine (killers), et un score par (couleur, départ, arrivée) (historique)
+        self.killers = [[None, None] for _ in range(MAX_SEARCH_DEPTH + 1)]
+        self.history = [0] * (2 * 64 * 64)
+        # Un tampon de scores par demi-coup, réutilisé par score_moves à chaque nœud ;
+        # la recherche de repos prolonge les demi-coups au-delà de la profondeur
+        self._move_scores = [[0] * MAX_MOVES for _ in range(2 * MAX_SEARCH_DEPTH + 2)]
+        # Conservée d'un coup à l'autre : les positions déjà vues ne sont pas recherchées à nouveau
+        if transposition_table is None:
+            transposition_table = TranspositionTable(hash_size_mb)
+        self.transposition_table = transposition_table
         self.piece_values = {
             PieceType.PAWN: 100,
             PieceType.KNIGHT: 320,
@@ -81,154 +174,608 @@ class ChessAI:
             [20, 20,  0,  0,  0,  0, 20, 20],
             [20, 30, 10,  0,  0, 10, 30, 20]
         ]
+        
+        self.build_eval_tables()
+
+    def build_eval_tables(self):
+        """Précalcule valeur + position pour chaque (couleur, type, case).
 
-    def get_best_move(self, board: ChessBoard) -> Optional[Tuple[Tuple[int, int], Tuple[int, int]]]:
-        """Retourne le meilleur mouvement pour l'IA"""
+        Les valeurs sont signées (positives pour les noirs) pour que
+        l'évaluation matérielle se mette à jour par simple addition à chaque
+        coup. À rappeler si les tables ci-dessus sont modifiées.
+        """
+        self.piece_square_values = [[[0] * 64 for _ in range(6)] for _ in range(2)]
+        self._batch_weights = None  # Version NumPy, construite par evaluate_batch
+        # Valeurs par indice de type, pour le tri MVV-LVA des prises
+        self.capture_values = [self.piece_values[piece] for piece in PIECE_TYPES]
+        for color in (WHITE_IDX, BLACK_IDX):
+            sign = 1 if color == BLACK_IDX else -1
+            for piece_type, piece in enumerate(PIECE_TYPES):
+                probe = Piece(piece, Color.BLACK if color == BLACK_IDX else Color.WHITE, 0, 0)
+                for sq in range(64):
+                    row, col = divmod(sq, 8)
+                    value = self.piece_values[piece] + self.get_position_value(probe, row, col)
+                    self.piece_square_values[color][piece_type][sq] = sign * value
+
+    def new_game(self):
+        """Oublie l'état de recherche lié à la partie précédente"""
+        self.transposition_table.clear()
+        self.clear_move_ordering()
+        if self._parallel is not None:
+            self._parallel.new_game()
+        self._pv = []
+        self.reset_stats()
+        self.last_search_info = {}
+
+    def clear_move_ordering(self):
+        """Vide les coups killer et l'historique"""
+        for killers in self.killers:
+            killers[0] = killers[1] = None
+        history = self.history
+        for index in range(len(history)):
+            history[index] = 0
+
+    def _age_move_ordering(self):
+        """Avant une recherche : les killers changent de sens, l'historique est divisé par deux"""
+        for killers in self.killers:
+            killers[0] = killers[1] = None
+        history = self.history
+        for index in range(len(history)):
+            history[index] >>= 1
+
+    def reset_stats(self):
+        """Remet à zéro les compteurs de nœuds et de coupures"""
+        self.nodes = 0
+        self.quiescence_nodes = 0
+        self.interior_nodes = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+
+    def set_difficulty(self, difficulty: int):
+        """Change la profondeur de recherche en conservant l'état accumulé"""
+        self.difficulty = difficulty
+
+    def get_best_move(self, board: ChessBoard, time_limit: Optional[float] = None,
+                      node_limit: Optional[int] = None,
+                      stop_event: Optional[threading.Event] = None) -> Optional[Move]:
+        """Retourne le meilleur mouvement pour l'IA.
+
+        ``stop_event`` permet d'interrompre la recherche depuis un autre
+        thread : le meilleur coup de la dernière itération terminée est
+        alors retourné.
+        """
         if board.current_player == Color.WHITE:
             return None  # L'IA joue uniquement les noirs
+
+        if self.book is not None:
+            move = self.book.choose(board)
+            if move is not None:
+                self.last_search_info = {"depth": 0, "score": None, "nodes": 0, "time": 0.0, "book": True}
+                return move
         
-        _, best_move = self.minimax(board, self.difficulty, -math.inf, math.inf, True)
+        time_limit = time_limit if time_limit is not None else self.time_limit
+        node_limit = node_limit if node_limit is not None else self.node_limit
+        max_depth = self.difficulty if time_limit is None and node_limit is None else MAX_SEARCH_DEPTH
+        if self.workers > 1 and self._probe_root(board) is None:
+            _, best_move = self._parallel_search().search(board, max_depth, time_limit, stop_event, node_limit)
+            self.last_search_info = self._parallel.last_search_info
+            return best_move
+        _, best_move = self.iterative_deepening(board, max_depth, time_limit, node_limit, stop_event)
         return best_move
 
-    def minimax(self, board: ChessBoard, depth: int, alpha: float, beta: float, 
-                maximizing_player: bool) -> Tuple[float, Optional[Tuple[Tuple[int, int], Tuple[int, int]]]]:
-        """Algorithme minimax avec élagage alpha-beta"""
-        if depth == 0 or board.game_over:
-            return self.evaluate_board(board), None
+    def _probe_root(self, board: ChessBoard) -> Optional[Tuple[float, Move]]:
+        """(score absolu, coup) donnés par les tables de finales, ou None"""
+        if self.tablebase is None:
+            return None
+        found = self.tablebase.best_move(board)
+        if found is None:
+            return None
+        move, result, distance = found
+        sign = 1 if board.side == BLACK_IDX else -1
+        score = sign * result * (TABLEBASE_WIN - distance) if result else 0
+        self.reset_stats()
+        self.last_search_info = {"depth": 0, "score": score, "nodes": 0, "time": 0.0,
+                                 "pv": [move], "tablebase": True}
+        return score, move
+
+    def search_options(self) -> dict:
+        """Options de la recherche, à transmettre aux processus de calcul"""
+        return {"use_mobility": self.use_mobility, "use_quiescence": self.use_quiescence,
+                "use_pvs": self.use_pvs, "use_null_move": self.use_null_move, "use_lmr": self.use_lmr}
+
+    def _parallel_search(self):
+        if self._parallel is None:
+            # Import local : parallel importe ce module
+            from parallel import ParallelSearch
+            self._parallel = ParallelSearch(self.workers, self.difficulty, self.hash_size_mb, self.parallel_mode,
+                                            self.search_options(), self.tablebase)
+        self._parallel.set_difficulty(self.difficulty)
+        return self._parallel
+
+    def close(self):
+        """Arrête les processus de la recherche parallèle, s'il y en a"""
+        if self._parallel is not None:
+            self._parallel.close()
+            self._parallel = None
+
+    def search_move(self, board: ChessBoard, move: Move, depth: int,
+                    alpha: float, beta: float, time_limit: Optional[float] = None,
+                    stop_event=None, node_limit: Optional[int] = None) -> Optional[float]:
+        """Score d'un coup de la racine, cherché à depth - 1 dans la fenêtre (alpha, beta).
+
+        Retourne None si le budget est épuisé avant la fin. Utilisé par les
+        processus de la recherche parallèle ; la position après le coup est
+        au demi-coup 1, comme dans la recherche séquentielle.
+        """
+        self.reset_stats()
+        self._deadline = time.monotonic() + time_limit if time_limit is not None else None
+        self._max_nodes = node_limit
+        self._stop_event = stop_event
+        self._check_budget = True
+        self._root_depth = depth
+        history_length = len(board.move_history)
+        material = self.material_score(board) + self.material_delta(board, move)
+        board.push(move)
+        try:
+            score, _ = self.minimax(board, depth - 1, alpha, beta, board.current_player == Color.BLACK, material)
+        except SearchTimeout:
+            score = None
+        finally:
+            while len(board.move_history) > history_length:
+                board.pop()
+            self._check_budget = False
+            self._stop_event = None
+        return score
+
+    def iterative_deepening(self, board: ChessBoard, max_depth: int, time_limit: Optional[float] = None,
+                            node_limit: Optional[int] = None,
+                            stop_event: Optional[threading.Event] = None) -> Tuple[float, Optional[Move]]:
+        """Recherche à profondeur croissante jusqu'à max_depth ou épuisement du budget.
+
+        Chaque itération commence par la variante principale de la précédente.
+        Si le budget est épuisé en cours d'itération, le résultat de la
+        dernière itération terminée est retourné. Une position des tables de
+        finales est résolue sans recherche.
+        """
+        probed = self._probe_root(board)
+        if probed is not None:
+            return probed
+        start = time.monotonic()
+        self.transposition_table.new_search()
+        self._age_move_ordering()
+        self.reset_stats()
+        self._deadline = start + time_limit if time_limit is not None else None
+        self._max_nodes = node_limit
+        self._stop_event = stop_event
+        self._pv = []
+        self.last_search_info = {}
+        history_length = len(board.move_history)
+        maximizing = board.current_player == Color.BLACK
         
-        best_move = None
-        moves = self.get_all_possible_moves(board, board.current_player)
+        best_score, best_move = -math.inf if maximizing else math.inf, None
+        completed_depth = 0
+        for depth in range(1, max_depth + 1):
+            # La profondeur 1 est toujours terminée pour avoir un coup à jouer
+            self._check_budget = depth > 1
+            self._root_depth = depth
+            try:
+                score, move = self.minimax(board, depth, -math.inf, math.inf, maximizing)
+            except SearchTimeout:
+                # Les coups en cours n'ont pas été annulés
+                while len(board.move_history) > history_length:
+                    board.pop()
+                break
+            best_score, best_move, completed_depth = score, move, depth
+            self._pv = self.get_principal_variation(board, depth)
+            # Remplacé d'un bloc : lisible depuis un autre thread pendant la recherche
+            self.last_search_info = self._search_info(completed_depth, best_score, start)
+            if abs(score) >= MATE_SCORE or self._budget_exhausted():
+                break  # Mat trouvé ou budget épuisé
         
-        if not moves:
-            # Pas de mouvements possibles
-            if board._is_king_in_check(board.current_player):
-                # Échec et mat
-                return -math.inf if maximizing_player else math.inf, None
-            else:
-                # Pat
-                return 0, None
+        self._check_budget = False
+        self._stop_event = None
+        self.last_search_info = self._search_info(completed_depth, best_score, start)
+        return best_score, best_move
+
+    def _search_info(self, depth: int, score: float, start: float) -> dict:
+        return {
+            "depth": depth,
+            "score": score,
+            "nodes": self.nodes,
+            "cutoffs": self.cutoffs,
+            "time": time.monotonic() - start,
+            "pv": self._pv,
+        }
+
+    def _budget_exhausted(self) -> bool:
+        if self._stop_event is not None and self._stop_event.is_set():
+            return True
+        if self._max_nodes is not None and self.nodes >= self._max_nodes:
+            return True
+        return self._deadline is not None and time.monotonic() >= self._deadline
+
+    def get_principal_variation(self, board: ChessBoard, depth: int) -> List[Move]:
+        """Reconstitue la variante principale à partir de la table de transposition"""
+        pv = []
+        for _ in range(depth):
+            entry = self.transposition_table.probe(board.zobrist_key)
+            if entry is None or entry[4] is None:
+                break
+            move = entry[4]
+            if move not in self.get_all_possible_moves(board, board.current_player):
+                break
+            board.push(move)
+            pv.append(move)
+        for _ in pv:
+            board.pop()
+        return pv
+
+    def minimax(self, board: ChessBoard, depth: int, alpha: float, beta: float, 
+                maximizing_player: bool, material: Optional[int] = None) -> Tuple[float, Optional[Move]]:
+        """Algorithme minimax avec élagage alpha-beta.
+
+        Les coups sont joués et annulés sur place avec ``push``/``pop`` :
+        le plateau est rendu dans son état d'origine. ``material`` est le
+        score matériel et positionnel de la position, mis à jour coup par
+        coup (calculé entièrement s'il n'est pas fourni).
+
+        Le score est absolu (positif pour les noirs) ; la recherche elle-même
+        est faite par ``negamax`` du point de vue du camp au trait.
+        """
+        if material is None:
+            material = self.material_score(board)
+        ply = max(0, self._root_depth - depth)
+        if maximizing_player:
+            return self.negamax(board, depth, alpha, beta, material, ply)
+        score, move = self.negamax(board, depth, -beta, -alpha, material, ply)
+        return -score, move
+
+    def negamax(self, board: ChessBoard, depth: int, alpha: float, beta: float, material: int,
+                ply: int = 0, allow_null: bool = True) -> Tuple[float, Optional[Move]]:
+        """Alpha-beta en forme negamax : le score est celui du camp au trait.
+
+        ``material`` reste absolu (positif pour les noirs). Selon les options
+        de recherche : fenêtre nulle pour les coups après le premier (PVS),
+        coup nul, et réduction des coups calmes tardifs (LMR).
+        """
+        self.nodes += 1
+        if self._check_budget and self.nodes & 255 == 0 and self._budget_exhausted():
+            raise SearchTimeout()
         
-        # Trier les mouvements pour améliorer l'élagage
-        moves = self.order_moves(board, moves)
+        color = board.current_player
+        sign = 1 if board.side == BLACK_IDX else -1
+        if board.game_over:
+            return sign * self.evaluate_board(board), None
+        halfmove = board.halfmove
+        if ply > 0 and halfmove >= 4 and (halfmove >= FIFTY_MOVE_PLIES or board.repetition_count(2) >= 2):
+            # Nulle par règle ; une seule répétition suffit dans l'arbre (au moins quatre demi-coups)
+            return 0, None
+        if self.tablebase is not None and ply > 0:
+            score = self._probe_tablebase(board, ply)
+            if score is not None:
+                return score, None
+        if depth <= 0:
+            if self.use_quiescence:
+                return self.quiescence(board, alpha, beta, material, ply), None
+            # push() ne détecte pas le mat : le vérifier aux feuilles
+            if board._is_checkmate(color):
+                return -MATE_SCORE, None
+            return sign * self.evaluate_board(board, material), None
         
-        if maximizing_player:
-            max_eval = -math.inf
-            for move in moves:
-                # Simuler le mouvement
-                board_copy = self.make_move_copy(board, move)
-                eval_score, _ = self.minimax(board_copy, depth - 1, alpha, beta, False)
-                
-                if eval_score > max_eval:
-                    max_eval = eval_score
-                    best_move = move
-                
-                alpha = max(alpha, eval_score)
+        # Consulter la table de transposition
+        key = board.zobrist_key
+        alpha_orig, beta_orig = alpha, beta
+        hash_move = None
+        entry = self.transposition_table.probe(key)
+        if entry is not None:
+            _, entry_depth, bound, entry_score, hash_move, _ = entry
+            if entry_depth >= depth:
+                if bound == EXACT:
+                    return entry_score, hash_move
+                elif bound == LOWER_BOUND:
+                    alpha = max(alpha, entry_score)
+                else:
+                    beta = min(beta, entry_score)
                 if beta <= alpha:
-                    break  # Élagage alpha-beta
+                    return entry_score, hash_move
+        
+        in_check = board._is_king_in_check(color)
+        
+        # Coup nul : si passer son tour suffit à dépasser beta, un vrai coup
+        # le ferait aussi (faux en zugzwang, d'où les gardes)
+        if (self.use_null_move and allow_null and ply > 0 and not in_check and depth >= NULL_MOVE_MIN_DEPTH
+                and abs(beta) < MATE_SCORE):
+            score = self._null_move_search(board, depth, beta, material, ply, sign)
+            if score is not None:
+                return score, None
+        
+        # Coups générés et triés au fur et à mesure : le coup de la table en
+        # premier, sinon celui de la variante principale précédente
+        if hash_move is None and 0 <= ply < len(self._pv):
+            hash_move = self._pv[ply]
+        killers = self.killers[ply] if ply < len(self.killers) else (None, None)
+        
+        self.interior_nodes += 1
+        best_score, best_move = -math.inf, None
+        mailbox = board.mailbox
+        index = -1
+        for index, move in enumerate(self.staged_moves(board, hash_move, ply)):
+            quiet = not self._capture_gain(mailbox, move) and move not in killers
+            child_material = material + self.material_delta(board, move)
+            board.push(move)
+            if index == 0:
+                score = -self.negamax(board, depth - 1, -beta, -alpha, child_material, ply + 1)[0]
+            else:
+                reduction = 0
+                # Pas de réduction à la racine : chaque coup y est cherché à pleine
+                # profondeur, comme dans la recherche parallèle (search_move)
+                if (self.use_lmr and ply > 0 and quiet and not in_check and depth >= LMR_MIN_DEPTH
+                        and index >= LMR_MIN_INDEX and not board._is_king_in_check(board.current_player)):
+                    reduction = 1 if index < LMR_MIN_INDEX * 2 or depth < 5 else 2
+                # Fenêtre nulle autour d'alpha : il suffit de savoir si le coup fait mieux
+                window = -alpha - 1 if self.use_pvs else -beta
+                score = -self.negamax(board, depth - 1 - reduction, window, -alpha, child_material, ply + 1)[0]
+                if reduction and score > alpha:
+                    score = -self.negamax(board, depth - 1, window, -alpha, child_material, ply + 1)[0]
+                # Un score >= beta en fenêtre nulle est une coupure : cela suppose des bornes
+                # sûres jusque dans la recherche de repos (voir l'élagage delta)
+                if self.use_pvs and alpha < score < beta:
+                    score = -self.negamax(board, depth - 1, -beta, -alpha, child_material, ply + 1)[0]
+            board.pop()
             
-            return max_eval, best_move
-        else:
-            min_eval = math.inf
-            for move in moves:
-                # Simuler le mouvement
-                board_copy = self.make_move_copy(board, move)
-                eval_score, _ = self.minimax(board_copy, depth - 1, alpha, beta, True)
-                
-                if eval_score < min_eval:
-                    min_eval = eval_score
-                    best_move = move
-                
-                beta = min(beta, eval_score)
-                if beta <= alpha:
-                    break  # Élagage alpha-beta
+            if score > best_score:
+                best_score = score
+                best_move = move
             
-            return min_eval, best_move
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                self._count_cutoff(index)
+                self._record_cutoff(board, move, depth, ply)
+                break  # Élagage alpha-beta
+        
+        if index < 0:
+            # Aucun coup légal : échec et mat, ou pat
+            score = -MATE_SCORE if in_check else 0
+            self.transposition_table.store(key, depth, EXACT, score, None)
+            return score, None
+        
+        self._store(key, depth, best_score, alpha_orig, beta_orig, best_move)
+        return best_score, best_move
+
+    def _probe_tablebase(self, board: ChessBoard, ply: int) -> Optional[float]:
+        """Score exact du camp au trait d'après les tables de finales, ou None"""
+        if popcount(board.occupied) > 3:
+            return None
+        probed = self.tablebase.probe(board)
+        if probed is None:
+            return None
+        result, distance = probed
+        # Mat le plus proche de la racine préféré
+        return result * (TABLEBASE_WIN - ply - distance) if result else 0
+
+    def _null_move_search(self, board: ChessBoard, depth: int, beta: float, material: int,
+                          ply: int, sign: int) -> Optional[float]:
+        """Score de coupure si le coup nul dépasse beta, sinon None"""
+        color_idx = BLACK_IDX if sign > 0 else WHITE_IDX
+        pieces = board.pieces[color_idx]
+        # Sans pièce autre que pions et roi, le zugzwang est fréquent : pas de coup nul
+        officers = popcount(board.occupancy[color_idx] & ~pieces[PAWN_IDX] & ~pieces[KING_IDX])
+        if not officers or sign * self.evaluate_board(board, material) < beta:
+            return None
+        reduction = NULL_MOVE_REDUCTION + (1 if depth > 6 else 0)
+        board.push_null()
+        score = -self.negamax(board, depth - 1 - reduction, -beta, -beta + 1, material, ply + 1, False)[0]
+        board.pop()
+        if score < beta:
+            return None
+        # Finale à une seule pièce : vérifier par une recherche réduite sans coup nul
+        if officers == 1:
+            verified = self.negamax(board, depth - 1 - reduction, beta - 1, beta, material, ply, False)[0]
+            if verified < beta:
+                return None
+        # Un mat trouvé après un coup nul n'est pas prouvé
+        return beta if score >= MATE_SCORE else score
+
+    def quiescence(self, board: ChessBoard, alpha: float, beta: float, material: int, ply: int = 0) -> float:
+        """Prolonge une feuille par les prises jusqu'à une position calme.
+
+        Le camp au trait peut s'en tenir à l'évaluation statique (stand-pat)
+        ou prendre ; les prises sont triées MVV-LVA (voir score_moves) et
+        celles qui ne peuvent pas ramener le score dans la fenêtre sont
+        élaguées (élagage delta). En échec, toutes les parades sont cherchées.
+        Score du point de vue du camp au trait, comme ``negamax`` ; ``ply``
+        est la distance à la racine, pour les distances au mat des tables.
+        """
+        self.nodes += 1
+        self.quiescence_nodes += 1
+        if self._check_budget and self.nodes & 255 == 0 and self._budget_exhausted():
+            raise SearchTimeout()
+
+        if self.tablebase is not None:
+            score = self._probe_tablebase(board, ply)
+            if score is not None:
+                return score
 
-    def get_all_possible_moves(self, board: ChessBoard, color: Color) -> List[Tuple[Tuple[int, int], Tuple[int, int]]]:
+        color = board.current_player
+        if board._is_king_in_check(color):
+            moves = self.get_all_possible_moves(board, color)
+            if not moves:
+                return -MATE_SCORE
+            stand_pat = None
+            best = -math.inf
+        else:
+            stand_pat = (1 if board.side == BLACK_IDX else -1) * self.evaluate_board(board, material)
+            if stand_pat >= beta:
+                return stand_pat
+            alpha = max(alpha, stand_pat)
+            best = stand_pat
+            moves = board.get_all_captures(color)
+
+        mailbox = board.mailbox
+        for move in self.pick_moves(board, moves, None, ply):
+            if stand_pat is not None:
+                optimistic = stand_pat + self._capture_gain(mailbox, move) + DELTA_MARGIN
+                if optimistic <= alpha:
+                    # La prise élaguée vaut au plus optimistic : la borne retournée doit le couvrir
+                    if optimistic > best:
+                        best = optimistic
+                    continue
+            delta = self.material_delta(board, move)
+            board.push(move)
+            score = -self.quiescence(board, -beta, -alpha, material + delta, ply + 1)
+            board.pop()
+            if score > best:
+                best = score
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+        return best
+
+    def _record_cutoff(self, board: ChessBoard, move: Move,
+                       depth: int, ply: int):
+        """Retient un coup calme qui a provoqué une coupure (killer et historique)"""
+        if self._capture_gain(board.mailbox, move):
+            return  # Les prises sont déjà bien triées par MVV-LVA
+        if 0 <= ply < len(self.killers):
+            killers = self.killers[ply]
+            if killers[0] != move:
+                killers[1] = killers[0]
+                killers[0] = move
+        index = board.mailbox[(move >> 6) & 63][0] * 4096 + (move & 4095)
+        history = self.history
+        history[index] += depth * depth
+        if history[index] > HISTORY_MAX:
+            for i in range(len(history)):
+                history[i] >>= 1
+
+    def _capture_gain(self, mailbox: list, move: Move) -> int:
+        """Gain matériel brut d'une prise, promotion comprise"""
+        values = self.capture_values
+        gain = 0
+        if move & MOVE_CAPTURE:
+            # Prise en passant : la case d'arrivée est vide
+            gain = values[PAWN_IDX] if move & MOVE_EN_PASSANT else values[mailbox[move & 63][1]]
+        promotion = (move >> MOVE_PROMOTION_SHIFT) & 7
+        if promotion:
+            gain += values[promotion] - values[PAWN_IDX]
+        return gain
+
+    def _count_cutoff(self, index: int):
+        self.cutoffs += 1
+        if index == 0:
+            self.first_move_cutoffs += 1
+
+    def _store(self, key: int, depth: int, score: float, alpha: float, beta: float, best_move):
+        """Enregistre un résultat avec le type de borne déduit de la fenêtre initiale"""
+        if score <= alpha:
+            bound = UPPER_BOUND
+        elif score >= beta:
+            bound = LOWER_BOUND
+        else:
+            bound = EXACT
+        self.transposition_table.store(key, depth, bound, score, best_move)
+
+    def get_all_possible_moves(self, board: ChessBoard, color: Color) -> List[Move]:
         """Retourne tous les mouvements possibles pour une couleur"""
-        moves = []
-        for row in range(8):
-            for col in range(8):
-                piece = board.board[row][col]
-                if piece and piece.color == color:
-                    piece_moves = board.get_valid_moves(piece)
-                    for move in piece_moves:
-                        moves.append(((row, col), move))
-        return moves
-
-    def make_move_copy(self, board: ChessBoard, move: Tuple[Tuple[int, int], Tuple[int, int]]) -> ChessBoard:
+        return board.get_all_valid_moves(color)
+
+    def make_move_copy(self, board: ChessBoard, move: Move) -> ChessBoard:
         """Crée une copie du plateau avec le mouvement effectué"""
-        # Créer une copie profonde du plateau
-        new_board = ChessBoard()
-        
-        # Copier l'état du plateau
-        for row in range(8):
-            for col in range(8):
-                if board.board[row][col]:
-                    piece = board.board[row][col]
-                    new_piece = Piece(piece.type, piece.color, piece.row, piece.col)
-                    new_piece.has_moved = piece.has_moved
-                    new_board.board[row][col] = new_piece
-                else:
-                    new_board.board[row][col] = None
-        
-        new_board.current_player = board.current_player
-        new_board.king_positions = board.king_positions.copy()
-        new_board.game_over = board.game_over
-        new_board.winner = board.winner
+        new_board = board.copy()
         
         # Effectuer le mouvement
-        from_pos, to_pos = move
-        new_board.make_move(from_pos, to_pos)
+        new_board.play(move)
         
         return new_board
 
-    def order_moves(self, board: ChessBoard, moves: List[Tuple[Tuple[int, int], Tuple[int, int]]]) -> List[Tuple[Tuple[int, int], Tuple[int, int]]]:
-        """Ordonne les mouvements pour améliorer l'élagage alpha-beta"""
-        def move_priority(move):
-            from_pos, to_pos = move
-            to_row, to_col = to_pos
-            
-            score = 0
-            
-            # Prioriser les captures
-            target = board.board[to_row][to_col]
-            if target:
-                score += self.piece_values[target.type]
-            
-            # Prioriser les mouvements vers le centre
-            center_distance = abs(3.5 - to_row) + abs(3.5 - to_col)
-            score += (7 - center_distance) * 10
-            
-            return score
-        
-        return sorted(moves, key=move_priority, reverse=True)
+    def order_moves(self, board: ChessBoard, moves: List[Move],
+                    hash_move=None, ply: int = -1) -> List[Move]:
+        """Ordonne tous les mouvements pour améliorer l'élagage alpha-beta"""
+        scores = self.score_moves(board, moves, hash_move, ply)
+        order = sorted(range(len(moves)), key=scores.__getitem__, reverse=True)
+        return [moves[index] for index in order]
+
+    def staged_moves(self, board: ChessBoard, hash_move=None, ply: int = -1):
+        """Produit les coups légaux par étapes, chacune générée à la demande.
+
+        Le coup de la table (vérifié seul avec ``is_legal``, sans générer les
+        autres coups), puis les prises triées MVV-LVA, puis les coups calmes
+        triés par killers et historique. Après une coupure, les étapes
+        suivantes ne sont ni développées ni triées.
+        """
+        if hash_move is not None:
+            if board.is_legal(hash_move):
+                yield hash_move
+            else:
+                hash_move = None
+        captures, quiet_targets = board.split_moves(board.current_player)
+        if hash_move in captures:
+            captures.remove(hash_move)
+        yield from self.pick_moves(board, captures, None, ply)
+        quiet_moves = board.expand_moves(quiet_targets)
+        if hash_move in quiet_moves:
+            quiet_moves.remove(hash_move)
+        yield from self.pick_moves(board, quiet_moves, None, ply)
+
+    def pick_moves(self, board: ChessBoard, moves: List[Move],
+                   hash_move=None, ply: int = -1):
+        """Produit les coups du meilleur au moins bon par tri par sélection paresseux.
+
+        Chaque coup n'est choisi qu'au moment où la recherche le demande :
+        après une coupure sur les premiers coups, le reste n'est jamais trié.
+        ``moves`` est réordonné sur place.
+        """
+        scores = self.score_moves(board, moves, hash_move, ply)
+        count = len(moves)
+        for i in range(count):
+            best = max(range(i, count), key=scores.__getitem__)
+            if best != i:
+                moves[i], moves[best] = moves[best], moves[i]
+                scores[i], scores[best] = scores[best], scores[i]
+            yield moves[i]
+
+    def score_moves(self, board: ChessBoard, moves: List[Move],
+                    hash_move=None, ply: int = -1) -> List[int]:
+        """Priorité de chaque coup : table, prises MVV-LVA, killers, historique.
 
-    def evaluate_board(self, board: ChessBoard) -> float:
+        Les scores sont écrits dans le tampon du demi-coup ``ply`` (seuls les
+        ``len(moves)`` premiers sont valides) ; hors de la recherche
+        (``ply`` négatif), une nouvelle liste est retournée.
+        """
+        mailbox = board.mailbox
+        values = self.capture_values
+        history = self.history
+        killer_1, killer_2 = self.killers[ply] if 0 <= ply < len(self.killers) else (None, None)
+        if 0 <= ply < len(self._move_scores) and len(moves) <= MAX_MOVES:
+            scores = self._move_scores[ply]
+        else:
+            scores = [0] * len(moves)
+        for index, move in enumerate(moves):
+            if move == hash_move:
+                scores[index] = HASH_MOVE_SCORE
+                continue
+            color, piece_type = mailbox[(move >> 6) & 63]
+            if move & (MOVE_CAPTURE | 7 << MOVE_PROMOTION_SHIFT):
+                scores[index] = CAPTURE_SCORE + self._capture_gain(mailbox, move) * 10 - values[piece_type] // 10
+            elif move == killer_1:
+                scores[index] = KILLER_SCORE + 1
+            elif move == killer_2:
+                scores[index] = KILLER_SCORE
+            else:
+                scores[index] = history[color * 4096 + (move & 4095)] + CENTER_BONUS[move & 63]
+        return scores
+
+    def evaluate_board(self, board: ChessBoard, material: Optional[int] = None) -> float:
         """Évalue la position du plateau"""
         if board.game_over:
             if board.winner == Color.BLACK:
-                return 10000
+                return MATE_SCORE
             elif board.winner == Color.WHITE:
-                return -10000
+                return -MATE_SCORE
             else:
                 return 0  # Match nul
         
-        score = 0
-        
-        for row in range(8):
-            for col in range(8):
-                piece = board.board[row][col]
-                if piece:
-                    piece_value = self.piece_values[piece.type]
-                    position_value = self.get_position_value(piece, row, col)
-                    
-                    total_value = piece_value + position_value
-                    
-                    if piece.color == Color.BLACK:
-                        score += total_value
-                    else:
-                        score -= total_value
+        score = material if material is not None else self.material_score(board)
         
         # Bonus pour la sécurité du roi
         if board._is_king_in_check(Color.WHITE):
@@ -236,13 +783,50 @@ class ChessAI:
         if board._is_king_in_check(Color.BLACK):
             score -= 50
         
-        # Bonus pour la mobilité
-        white_moves = len(self.get_all_possible_moves(board, Color.WHITE))
-        black_moves = len(self.get_all_possible_moves(board, Color.BLACK))
-        score += (black_moves - white_moves) * 10
+        # Bonus pour la mobilité (coups pseudo-légaux, sans test d'échec)
+        if self.use_mobility:
+            score += (board.pseudo_mobility(BLACK_IDX) - board.pseudo_mobility(WHITE_IDX)) * 10
         
         return score
 
+    def material_score(self, board: ChessBoard) -> int:
+        """Somme des valeurs matérielles et positionnelles, calculée depuis zéro"""
+        values = self.piece_square_values
+        score = 0
+        for sq, code in enumerate(board.mailbox):
+            if code is not None:
+                score += values[code[0]][code[1]][sq]
+        return score
+
+    def evaluate_batch(self, boards: List[ChessBoard]):
+        """material_score d'un lot de positions, en un calcul vectorisé (tableau NumPy)"""
+        # Import local : NumPy n'est pas nécessaire pour la recherche elle-même
+        from batch_eval import encode_boards, evaluate_planes, piece_square_weights
+        if self._batch_weights is None:
+            self._batch_weights = piece_square_weights(self)
+        return evaluate_planes(encode_boards(boards), self._batch_weights)
+
+    def material_delta(self, board: ChessBoard, move: Move) -> int:
+        """Variation de material_score causée par un coup, à calculer avant push()"""
+        from_sq = (move >> 6) & 63
+        to_sq = move & 63
+        values = self.piece_square_values
+        color, piece_type = board.mailbox[from_sq]
+        delta = -values[color][piece_type][from_sq]
+        promotion = (move >> MOVE_PROMOTION_SHIFT) & 7
+        delta += values[color][promotion or piece_type][to_sq]
+        if move & MOVE_EN_PASSANT:
+            captured_sq = to_sq + 8 if color == WHITE_IDX else to_sq - 8
+            delta -= values[color ^ 1][PAWN_IDX][captured_sq]
+        elif move & MOVE_CAPTURE:
+            captured = board.mailbox[to_sq]
+            delta -= values[captured[0]][captured[1]][to_sq]
+        elif piece_type == KING_IDX and to_sq - from_sq in (2, -2):
+            # Roque : la tour bouge aussi
+            rook_from, rook_to = CASTLING_ROOKS[to_sq]
+            delta += values[color][ROOK_IDX][rook_to] - values[color][ROOK_IDX][rook_from]
+        return delta
+
     def get_position_value(self, piece: Piece, row: int, col: int) -> int:
         """Retourne la valeur positionnelle d'une pièce"""
         if piece.color == Color.WHITE:
@@ -264,8 +848,15 @@ class ChessAI:
         
         return 0
 
+# Instance partagée par get_ai_move, conservée d'un appel à l'autre
+_default_ai = None
+
 # Fonction utilitaire pour intégrer l'IA dans le jeu principal
-def get_ai_move(board: ChessBoard, difficulty: int = 3) -> Optional[Tuple[Tuple[int, int], Tuple[int, int]]]:
+def get_ai_move(board: ChessBoard, difficulty: int = 3) -> Optional[Move]:
     """Interface simplifiée pour obtenir un mouvement de l'IA"""
-    ai = ChessAI(difficulty)
-    return ai.get_best_move(board) 
\ No newline at end of file
+    global _default_ai
+    if _default_ai is None:
+        _default_ai = ChessAI(difficulty)
+    else:
+        _default_ai.set_difficulty(difficulty)
+    return _default_ai.get_best_move(board)
@@ -0,0 +1,899 @@
+"""
+Moteur d'échecs sans interface : pièces, plateau et règles.
+
+Ce module n'importe pas pygame, pour que l'IA, les outils en ligne de
+commande et les processus de calcul puissent l'utiliser sans affichage.
+"""
+
+import random
+from enum import Enum
+from typing import List, Tuple, Optional, Dict
+
+from bitboard import (FULL, RANK_MASKS, LIGHT_SQUARES, square, bit, squares, popcount,
+                      north, south, knight_attacks, king_attacks, pawn_attacks,
+                      rook_attacks, bishop_attacks, KNIGHT_ATTACKS, KING_ATTACKS,
+                      PAWN_ATTACKS, BETWEEN)
+
+class PieceType(Enum):
+    PAWN = "pawn"
+    ROOK = "rook"
+    KNIGHT = "knight"
+    BISHOP = "bishop"
+    QUEEN = "queen"
+    KING = "king"
+
+class Color(Enum):
+    WHITE = "white"
+    BLACK = "black"
+
+class Piece:
+    """Vue d'une pièce pour l'interface ; le moteur travaille sur les bitboards"""
+    __slots__ = ("type", "color", "row", "col", "has_moved")
+
+    def __init__(self, piece_type: PieceType, color: Color, row: int, col: int):
+        self.type = piece_type
+        self.color = color
+        self.row = row
+        self.col = col
+        self.has_moved = False
+
+    def __str__(self):
+        return f"{self.color.value}_{self.type.value}"
+
+# Indices entiers utilisés par les bitboards
+WHITE_IDX, BLACK_IDX = 0, 1
+PAWN_IDX, KNIGHT_IDX, BISHOP_IDX, ROOK_IDX, QUEEN_IDX, KING_IDX = range(6)
+
+COLORS = (Color.WHITE, Color.BLACK)
+PIECE_TYPES = (PieceType.PAWN, PieceType.KNIGHT, PieceType.BISHOP,
+               PieceType.ROOK, PieceType.QUEEN, PieceType.KING)
+COLOR_INDEX = {color: i for i, color in enumerate(COLORS)}
+PIECE_INDEX = {piece_type: i for i, piece_type in enumerate(PIECE_TYPES)}
+PIECE_CODES = [[(color, piece_type) for piece_type in range(6)] for color in range(2)]
+
+# Coups encodés dans un entier :
+#   bits 0-5 case d'arrivée, 6-11 case de départ,
+#   12-14 pièce de promotion (indice de type, 0 sans promotion), 15+ drapeaux
+# Le roque est un coup du roi de deux cases ; la prise en passant porte
+# MOVE_CAPTURE et MOVE_EN_PASSANT.
+Move = int
+MOVE_PROMOTION_SHIFT = 12
+MOVE_CAPTURE = 1 << 15
+MOVE_EN_PASSANT = 1 << 16
+NULL_MOVE = 0  # Coup nul de la recherche (a8a8 n'est jamais un coup légal)
+PROMOTION_TYPES = (QUEEN_IDX, KNIGHT_IDX, ROOK_IDX, BISHOP_IDX)
+
+def encode_move(from_sq: int, to_sq: int, promotion: int = 0, flags: int = 0) -> Move:
+    return flags | promotion << MOVE_PROMOTION_SHIFT | from_sq << 6 | to_sq
+
+def move_from(move: Move) -> int:
+    return (move >> 6) & 63
+
+def move_to(move: Move) -> int:
+    return move & 63
+
+def move_promotion(move: Move) -> int:
+    return (move >> MOVE_PROMOTION_SHIFT) & 7
+
+def move_to_positions(move: Move) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+    """Cases (ligne, colonne) de départ et d'arrivée, pour l'interface"""
+    return divmod((move >> 6) & 63, 8), divmod(move & 63, 8)
+
+def square_name(sq: int) -> str:
+    """Nom algébrique d'une case, par exemple e4"""
+    row, col = divmod(sq, 8)
+    return f"{'abcdefgh'[col]}{8 - row}"
+
+# Notation FEN
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+FEN_SYMBOLS = ("PNBRQK", "pnbrqk")
+FEN_PIECES = {symbol: (color, piece_type) for color, symbols in enumerate(FEN_SYMBOLS)
+              for piece_type, symbol in enumerate(symbols)}
+# Droits de roque : (symbole, case du roi, case de la tour)
+FEN_CASTLING = (("K", 60, 63), ("Q", 60, 56), ("k", 4, 7), ("q", 4, 0))
+# Un droit de roque tient tant que le roi et la tour n'ont pas quitté leur case
+CASTLING_MASKS = tuple((1 << king_sq) | (1 << rook_sq) for _, king_sq, rook_sq in FEN_CASTLING)
+CASTLING_SQUARES = CASTLING_MASKS[0] | CASTLING_MASKS[1] | CASTLING_MASKS[2] | CASTLING_MASKS[3]
+# Roques par couleur : (case du roi, [(arrivée du roi, départ et arrivée de la tour)])
+CASTLING_MOVES = ((60, ((62, 63, 61), (58, 56, 59))), (4, ((6, 7, 5), (2, 0, 3))))
+CASTLING_ROOKS = {king_to: (rook_from, rook_to) for _, moves in CASTLING_MOVES
+                  for king_to, rook_from, rook_to in moves}
+
+# Règles de nulle
+FIFTY_MOVE_PLIES = 100
+
+# Clés de Zobrist (graine fixe : les clés sont identiques d'un processus à l'autre)
+_zobrist_random = random.Random(0x5EED)
+ZOBRIST_PIECES = [[[_zobrist_random.getrandbits(64) for _ in range(64)]
+                   for _ in range(6)] for _ in range(2)]
+ZOBRIST_BLACK_TO_MOVE = _zobrist_random.getrandbits(64)
+# Une clé par combinaison de droits de roque, une par colonne de prise en passant
+ZOBRIST_CASTLING = [0] + [_zobrist_random.getrandbits(64) for _ in range(15)]
+ZOBRIST_EN_PASSANT = [_zobrist_random.getrandbits(64) for _ in range(8)]
+
+def castling_rights(unmoved: int) -> int:
+    """Droits de roque (bits dans l'ordre de FEN_CASTLING) d'un masque de pièces non déplacées"""
+    rights = 0
+    for index, mask in enumerate(CASTLING_MASKS):
+        if unmoved & mask == mask:
+            rights |= 1 << index
+    return rights
+
+class ChessBoard:
+    """Plateau d'échecs représenté par des bitboards 64 bits.
+
+    Chaque couple (couleur, type) possède son bitboard dans ``pieces`` ;
+    ``occupancy`` et ``occupied`` sont les masques d'occupation par couleur et
+    globaux. ``board`` reste disponible sous forme de grille 8x8 de ``Piece``
+    pour l'interface, reconstruite à la demande.
+    """
+
+    def __init__(self, fen: Optional[str] = None):
+        self.pieces = [[0] * 6 for _ in range(2)]
+        self.occupancy = [0, 0]
+        self.occupied = 0
+        self.mailbox = [None] * 64  # (couleur, type) par case
+        self.unmoved = 0  # Cases dont la pièce n'a jamais bougé (droits de roque)
+        self.side = WHITE_IDX  # Camp au trait (indice de couleur)
+        self.ep_square = None  # Case de prise en passant, seulement si un pion peut y prendre
+        self.halfmove = 0  # Demi-coups depuis la dernière prise ou le dernier coup de pion
+        self.game_over = False
+        self.winner = None
+        self.end_reason = None  # Motif de fin : mat, pat ou règle de nulle
+        self.selected_piece = None
+        self.valid_moves = []
+        self.move_history = []
+        self.zobrist_key = 0  # Clé de hachage, mise à jour à chaque coup
+        self._grid = None
+        self._legal_cache = None
+        # Position de départ de move_history, pour l'export FEN et PGN
+        self.start_fen = START_FEN
+        self.start_side = WHITE_IDX
+        self.start_halfmove = 0
+        self.start_fullmove = 1
+        if fen is None:
+            self.setup_board()
+        else:
+            self.set_fen(fen)
+
+    @classmethod
+    def from_fen(cls, fen: str) -> "ChessBoard":
+        return cls(fen)
+
+    @property
+    def current_player(self) -> Color:
+        return COLORS[self.side]
+
+    @current_player.setter
+    def current_player(self, color: Color):
+        self.side = COLOR_INDEX[color]
+
+    def setup_board(self):
+        self._clear()
+
+        # Placement des pions
+        for col in range(8):
+            self._put_piece(square(1, col), BLACK_IDX, PAWN_IDX)
+            self._put_piece(square(6, col), WHITE_IDX, PAWN_IDX)
+
+        # Placement des pièces noires et blanches
+        piece_order = [ROOK_IDX, KNIGHT_IDX, BISHOP_IDX, QUEEN_IDX,
+                       KING_IDX, BISHOP_IDX, KNIGHT_IDX, ROOK_IDX]
+
+        for col, piece_type in enumerate(piece_order):
+            self._put_piece(square(0, col), BLACK_IDX, piece_type)
+            self._put_piece(square(7, col), WHITE_IDX, piece_type)
+
+        self.unmoved = self.occupied
+        self._reset_game(START_FEN, 0, 1)
+
+    def set_fen(self, fen: str):
+        """Place la position décrite par une FEN ; ValueError si elle est invalide.
+
+        Les droits de roque sont conservés dans ``unmoved``. La case en
+        passant n'est retenue que si un pion du camp au trait peut y prendre.
+        """
+        fields = fen.split()
+        if not 1 <= len(fields) <= 6:
+            raise ValueError(f"FEN invalide : {fen!r}")
+        fields += ["w", "-", "-", "0", "1"][len(fields) - 1:]
+        placement, side, castling, en_passant, halfmove, fullmove = fields
+        ranks = placement.split("/")
+        if len(ranks) != 8 or side not in ("w", "b"):
+            raise ValueError(f"FEN invalide : {fen!r}")
+        if not (halfmove.isdigit() and fullmove.isdigit()):
+            raise ValueError(f"FEN invalide (compteurs) : {fen!r}")
+
+        self.side = WHITE_IDX if side == "w" else BLACK_IDX
+        self._clear()
+        for row, rank in enumerate(ranks):
+            col = 0
+            for char in rank:
+                if char in "12345678":
+                    col += int(char)
+                elif char in FEN_PIECES and col < 8:
+                    self._put_piece(row * 8 + col, *FEN_PIECES[char])
+                    col += 1
+                else:
+                    raise ValueError(f"FEN invalide (rangée {8 - row}) : {fen!r}")
+            if col != 8:
+                raise ValueError(f"FEN invalide (rangée {8 - row}) : {fen!r}")
+        if popcount(self.pieces[WHITE_IDX][KING_IDX]) != 1 or popcount(self.pieces[BLACK_IDX][KING_IDX]) != 1:
+            raise ValueError(f"FEN invalide (il faut un roi de chaque couleur) : {fen!r}")
+        # Le camp qui vient de jouer ne peut pas avoir laissé son roi en échec
+        king = self.pieces[self.side ^ 1][KING_IDX]
+        if self._attackers(king.bit_length() - 1, self.side, self.occupied):
+            raise ValueError(f"FEN invalide (roi du camp qui n'a pas le trait en échec) : {fen!r}")
+
+        # Pions sur leur rangée de départ, rois et tours selon les droits de roque
+        unmoved = self.pieces[WHITE_IDX][PAWN_IDX] & RANK_MASKS[6] | self.pieces[BLACK_IDX][PAWN_IDX] & RANK_MASKS[1]
+        if castling != "-":
+            for symbol, king_sq, rook_sq in FEN_CASTLING:
+                if symbol in castling:
+                    color = WHITE_IDX if symbol.isupper() else BLACK_IDX
+                    if self.mailbox[king_sq] == (color, KING_IDX) and self.mailbox[rook_sq] == (color, ROOK_IDX):
+                        unmoved |= (1 << king_sq) | (1 << rook_sq)
+        self.unmoved = unmoved
+
+        # Case en passant : derrière un pion adverse qui vient d'avancer de deux cases
+        if en_passant != "-":
+            row = 2 if self.side == WHITE_IDX else 5
+            pawn_row = 3 if self.side == WHITE_IDX else 4
+            if (len(en_passant) != 2 or en_passant[0] not in "abcdefgh"
+                    or en_passant[1] != str(8 - row)):
+                raise ValueError(f"FEN invalide (prise en passant) : {fen!r}")
+            col = "abcdefgh".index(en_passant[0])
+            if self.mailbox[pawn_row * 8 + col] != (self.side ^ 1, PAWN_IDX):
+                raise ValueError(f"FEN invalide (prise en passant) : {fen!r}")
+            self.ep_square = self._en_passant_target(row * 8 + col, self.side ^ 1)
+
+        self._reset_game(None, int(halfmove), max(1, int(fullmove)))
+        self.start_fen = self.to_fen()
+        self._update_game_over()
+
+    def _reset_game(self, start_fen: Optional[str], halfmove: int, fullmove: int):
+        self.game_over = False
+        self.winner = None
+        self.end_reason = None
+        self.halfmove = halfmove
+        self.zobrist_key = self.compute_zobrist()
+        self.selected_piece = None
+        self.valid_moves = []
+        self.move_history = []
+        self.start_fen = start_fen
+        self.start_side = self.side
+        self.start_halfmove = halfmove
+        self.start_fullmove = fullmove
+
+    def to_fen(self) -> str:
+        """FEN de la position courante"""
+        ranks = []
+        for row in range(8):
+            rank, empty = "", 0
+            for code in self.mailbox[row * 8:row * 8 + 8]:
+                if code is None:
+                    empty += 1
+                    continue
+                if empty:
+                    rank += str(empty)
+                    empty = 0
+                rank += FEN_SYMBOLS[code[0]][code[1]]
+            ranks.append(rank + str(empty) if empty else rank)
+
+        rights = castling_rights(self.unmoved)
+        castling = "".join(symbol for index, (symbol, _, _) in enumerate(FEN_CASTLING) if rights >> index & 1)
+        en_passant = square_name(self.ep_square) if self.ep_square is not None else "-"
+        return (f"{'/'.join(ranks)} {'wb'[self.side]} {castling or '-'} {en_passant} "
+                f"{self.halfmove_clock()} {self.fullmove_number()}")
+
+    def halfmove_clock(self) -> int:
+        """Demi-coups depuis la dernière prise ou le dernier coup de pion"""
+        return self.halfmove
+
+    def fullmove_number(self) -> int:
+        plies = sum(1 for entry in self.move_history if entry[0] != NULL_MOVE)
+        return self.start_fullmove + (plies + self.start_side) // 2
+
+    def _clear(self):
+        self.pieces = [[0] * 6 for _ in range(2)]
+        self.occupancy = [0, 0]
+        self.occupied = 0
+        self.mailbox = [None] * 64
+        self.unmoved = 0
+        self.ep_square = None
+        self.zobrist_key = 0 if self.side == WHITE_IDX else ZOBRIST_BLACK_TO_MOVE
+        self._grid = None
+        self._legal_cache = None
+
+    def _put_piece(self, sq: int, color: int, piece_type: int):
+        mask = 1 << sq
+        self.pieces[color][piece_type] |= mask
+        self.occupancy[color] |= mask
+        self.occupied |= mask
+        self.mailbox[sq] = PIECE_CODES[color][piece_type]
+        self.zobrist_key ^= ZOBRIST_PIECES[color][piece_type][sq]
+
+    def _remove_piece(self, sq: int) -> Optional[Tuple[int, int]]:
+        code = self.mailbox[sq]
+        if code is not None:
+            color, piece_type = code
+            mask = ~(1 << sq)
+            self.pieces[color][piece_type] &= mask
+            self.occupancy[color] &= mask
+            self.occupied &= mask
+            self.mailbox[sq] = None
+            self.zobrist_key ^= ZOBRIST_PIECES[color][piece_type][sq]
+        return code
+
+    def copy(self) -> "ChessBoard":
+        """Copie légère du plateau : quelques entiers et une liste de 64 cases"""
+        new_board = ChessBoard.__new__(ChessBoard)
+        new_board.pieces = [self.pieces[0][:], self.pieces[1][:]]
+        new_board.occupancy = self.occupancy[:]
+        new_board.occupied = self.occupied
+        new_board.mailbox = self.mailbox[:]
+        new_board.unmoved = self.unmoved
+        new_board.side = self.side
+        new_board.ep_square = self.ep_square
+        new_board.halfmove = self.halfmove
+        new_board.game_over = self.game_over
+        new_board.winner = self.winner
+        new_board.end_reason = self.end_reason
+        new_board.selected_piece = None
+        new_board.valid_moves = []
+        new_board.move_history = self.move_history[:]
+        new_board.zobrist_key = self.zobrist_key
+        new_board._grid = None
+        new_board._legal_cache = None
+        new_board.start_fen = self.start_fen
+        new_board.start_side = self.start_side
+        new_board.start_halfmove = self.start_halfmove
+        new_board.start_fullmove = self.start_fullmove
+        return new_board
+
+    @property
+    def board(self) -> List[List[Optional[Piece]]]:
+        """Grille 8x8 de pièces, reconstruite après chaque coup"""
+        if self._grid is None:
+            self._grid = [[self.piece_at(row, col) for col in range(8)] for row in range(8)]
+        return self._grid
+
+    @property
+    def king_positions(self) -> Dict[Color, Tuple[int, int]]:
+        positions = {}
+        for color in (WHITE_IDX, BLACK_IDX):
+            king = self.pieces[color][KING_IDX]
+            if king:
+                positions[COLORS[color]] = divmod(king.bit_length() - 1, 8)
+        return positions
+
+    def compute_zobrist(self) -> int:
+        """Recalcule la clé de Zobrist depuis zéro (la clé est tenue à jour par push/pop)"""
+        key = 0 if self.side == WHITE_IDX else ZOBRIST_BLACK_TO_MOVE
+        for sq, code in enumerate(self.mailbox):
+            if code is not None:
+                key ^= ZOBRIST_PIECES[code[0]][code[1]][sq]
+        key ^= ZOBRIST_CASTLING[castling_rights(self.unmoved)]
+        if self.ep_square is not None:
+            key ^= ZOBRIST_EN_PASSANT[self.ep_square & 7]
+        return key
+
+    def piece_at(self, row: int, col: int) -> Optional[Piece]:
+        code = self.mailbox[square(row, col)]
+        if code is None:
+            return None
+        color, piece_type = code
+        piece = Piece(PIECE_TYPES[piece_type], COLORS[color], row, col)
+        piece.has_moved = not self.unmoved & bit(row, col)
+        return piece
+
+    def get_valid_moves(self, piece: Piece) -> List[Tuple[int, int]]:
+        from_sq = square(piece.row, piece.col)
+        code = self.mailbox[from_sq]
+        if code is None:
+            return []
+        color, piece_type = code
+
+        # Filtrer les mouvements qui mettent le roi en échec
+        targets = self._legal_targets(from_sq, color, piece_type)
+        return [divmod(sq, 8) for sq in squares(targets)]
+
+    def get_all_valid_moves(self, color: Color) -> List[Move]:
+        """Retourne tous les mouvements légaux d'une couleur"""
+        captures, quiet_targets = self.split_moves(color)
+        return captures + self.expand_moves(quiet_targets)
+
+    def get_all_captures(self, color: Color) -> List[Move]:
+        """Retourne les prises et les promotions en dame légales d'une couleur"""
+        return [move for move in self.split_moves(color)[0]
+                if (move >> MOVE_PROMOTION_SHIFT) & 7 in (0, QUEEN_IDX)]
+
+    def split_moves(self, color: Color) -> Tuple[List[Move], List[Tuple[int, int]]]:
+        """Sépare les coups légaux d'une couleur en deux étapes.
+
+        Retourne la liste des prises et promotions, et pour chaque pièce le
+        couple (case, bitboard des coups calmes), à développer avec
+        ``expand_moves`` seulement si la recherche en a besoin.
+        """
+        color_idx = COLOR_INDEX[color]
+        enemies = self.occupancy[color_idx ^ 1]
+        promotion_rank = RANK_MASKS[0] if color_idx == WHITE_IDX else RANK_MASKS[7]
+        en_passant = 1 << self.ep_square if self.ep_square is not None else 0
+        captures = []
+        quiet_targets = []
+        mailbox = self.mailbox
+        for from_sq in squares(self.occupancy[color_idx]):
+            _, piece_type = mailbox[from_sq]
+            targets = self._legal_targets(from_sq, color_idx, piece_type)
+            if piece_type == PAWN_IDX:
+                for to_sq in squares(targets & promotion_rank):
+                    flags = MOVE_CAPTURE if enemies >> to_sq & 1 else 0
+                    for promotion in PROMOTION_TYPES:
+                        captures.append(flags | promotion << MOVE_PROMOTION_SHIFT | from_sq << 6 | to_sq)
+                targets &= ~promotion_rank
+                if targets & en_passant:
+                    captures.append(MOVE_CAPTURE | MOVE_EN_PASSANT | from_sq << 6 | self.ep_square)
+                    targets ^= en_passant
+            for to_sq in squares(targets & enemies):
+                captures.append(MOVE_CAPTURE | from_sq << 6 | to_sq)
+            if targets & ~enemies:
+                quiet_targets.append((from_sq, targets & ~enemies))
+        return captures, quiet_targets
+
+    @staticmethod
+    def expand_moves(targets: List[Tuple[int, int]]) -> List[Move]:
+        """Développe des couples (case de départ, bitboard des arrivées) en coups"""
+        moves = []
+        for from_sq, to_squares in targets:
+            origin = from_sq << 6
+            for to_sq in squares(to_squares):
+                moves.append(origin | to_sq)
+        return moves
+
+    def is_legal(self, move: Move) -> bool:
+        """Vérifie un coup isolé (coup de la table de transposition par exemple).
+
+        Teste directement si le roi est attaqué après le coup, sans calculer
+        les clouages ni générer les autres coups.
+        """
+        from_sq, to_sq = (move >> 6) & 63, move & 63
+        code = self.mailbox[from_sq]
+        color_idx = self.side
+        if code is None or code[0] != color_idx:
+            return False
+        piece_type = code[1]
+        to_bit = 1 << to_sq
+        if (piece_type == PAWN_IDX and to_sq == self.ep_square
+                or piece_type == KING_IDX and to_sq - from_sq in (2, -2)):
+            # Prise en passant et roque : rares, vérifiés par le générateur de coups
+            flags = MOVE_CAPTURE | MOVE_EN_PASSANT if piece_type == PAWN_IDX else 0
+            return (move == flags | from_sq << 6 | to_sq
+                    and bool(self._legal_targets(from_sq, color_idx, piece_type) & to_bit))
+        if not self._pseudo_targets(from_sq, color_idx, piece_type) & to_bit:
+            return False
+        # Drapeaux et promotion doivent correspondre au coup généré
+        if bool(move & MOVE_CAPTURE) != (self.mailbox[to_sq] is not None) or move & MOVE_EN_PASSANT:
+            return False
+        promotes = piece_type == PAWN_IDX and (to_sq < 8 or to_sq >= 56)
+        if promotes != ((move >> MOVE_PROMOTION_SHIFT) & 7 in PROMOTION_TYPES):
+            return False
+        if piece_type == KING_IDX:
+            king_sq = to_sq
+        else:
+            king = self.pieces[color_idx][KING_IDX]
+            if not king:
+                return True
+            king_sq = king.bit_length() - 1
+        occupied = (self.occupied ^ (1 << from_sq)) | to_bit
+        # Une pièce prise en to_sq n'attaque plus
+        return not self._attackers(king_sq, color_idx ^ 1, occupied) & ~to_bit
+
+    def find_move(self, from_pos: Tuple[int, int], to_pos: Tuple[int, int],
+                  promotion: int = QUEEN_IDX) -> Optional[Move]:
+        """Coup légal correspondant à deux cases de l'interface, ou None"""
+        from_sq, to_sq = square(*from_pos), square(*to_pos)
+        code = self.mailbox[from_sq]
+        if code is None or code[0] != self.side:
+            return None
+        if not self._legal_targets(from_sq, self.side, code[1]) & (1 << to_sq):
+            return None
+        if code[1] != PAWN_IDX or 8 <= to_sq < 56:
+            promotion = 0
+        if code[1] == PAWN_IDX and to_sq == self.ep_square:
+            flags = MOVE_CAPTURE | MOVE_EN_PASSANT
+        else:
+            flags = MOVE_CAPTURE if self.mailbox[to_sq] is not None else 0
+        return encode_move(from_sq, to_sq, promotion, flags)
+
+    def _pseudo_targets(self, sq: int, color: int, piece_type: int) -> int:
+        """Cases atteignables sans tenir compte de l'échec au roi"""
+        own = self.occupancy[color]
+        if piece_type == PAWN_IDX:
+            return self._pawn_targets(sq, color)
+        elif piece_type == KNIGHT_IDX:
+            return KNIGHT_ATTACKS[sq] & ~own
+        elif piece_type == BISHOP_IDX:
+            return bishop_attacks(sq, self.occupied) & ~own
+        elif piece_type == ROOK_IDX:
+            return rook_attacks(sq, self.occupied) & ~own
+        elif piece_type == QUEEN_IDX:
+            return (rook_attacks(sq, self.occupied) | bishop_attacks(sq, self.occupied)) & ~own
+        return KING_ATTACKS[sq] & ~own
+
+    def pseudo_mobility(self, color: int) -> int:
+        """Nombre de coups pseudo-légaux d'une couleur (sans filtrer les échecs)"""
+        mobility = 0
+        mailbox = self.mailbox
+        for sq in squares(self.occupancy[color]):
+            mobility += popcount(self._pseudo_targets(sq, color, mailbox[sq][1]))
+        return mobility
+
+    def _pawn_targets(self, sq: int, color: int) -> int:
+        pawn = 1 << sq
+        empty = ~self.occupied & FULL
+        if color == WHITE_IDX:
+            # Mouvement d'une case, puis de deux cases depuis la ligne de départ
+            single = north(pawn) & empty
+            double = north(single) & empty & RANK_MASKS[4]
+        else:
+            single = south(pawn) & empty
+            double = south(single) & empty & RANK_MASKS[3]
+
+        # Captures en diagonale, en passant comprise
+        enemies = self.occupancy[color ^ 1]
+        if self.ep_square is not None:
+            enemies |= 1 << self.ep_square
+        return single | double | PAWN_ATTACKS[color][sq] & enemies
+
+    def _legal_targets(self, from_sq: int, color: int, piece_type: int) -> int:
+        targets = self._pseudo_targets(from_sq, color, piece_type)
+        check_mask, pins, danger = self._legal_context(color)
+        if piece_type == KING_IDX:
+            targets &= ~danger
+            if check_mask == FULL and self.unmoved >> from_sq & 1:
+                targets |= self._castling_targets(from_sq, color, danger)
+            return targets
+        en_passant = 0
+        if piece_type == PAWN_IDX and self.ep_square is not None:
+            en_passant = targets & (1 << self.ep_square)
+        # Parer l'échec, et ne pas quitter la ligne d'un clouage
+        targets &= check_mask
+        pin = pins.get(from_sq)
+        if pin is not None:
+            targets &= pin
+        if en_passant:
+            # Le pion pris n'est pas sur la case d'arrivée : les masques ne suffisent pas
+            targets &= ~en_passant
+            if self._en_passant_is_legal(from_sq, color):
+                targets |= en_passant
+        return targets
+
+    def _castling_targets(self, king_sq: int, color: int, danger: int) -> int:
+        """Cases d'arrivée du roi pour les roques permis (roi hors d'échec)"""
+        home, moves = CASTLING_MOVES[color]
+        if king_sq != home:
+            return 0
+        targets = 0
+        for king_to, rook_from, _ in moves:
+            # Tour jamais déplacée, cases libres jusqu'à elle, passage du roi non attaqué
+            if (self.unmoved >> rook_from & 1 and not BETWEEN[king_sq][rook_from] & self.occupied
+                    and not (BETWEEN[king_sq][king_to] | 1 << king_to) & danger):
+                targets |= 1 << king_to
+        return targets
+
+    def _en_passant_is_legal(self, from_sq: int, color: int) -> bool:
+        """Le roi reste-t-il hors d'échec une fois les deux pions retirés de leurs cases ?"""
+        king = self.pieces[color][KING_IDX]
+        if not king:
+            return True
+        captured = 1 << (self.ep_square + 8 if color == WHITE_IDX else self.ep_square - 8)
+        occupied = (self.occupied ^ (1 << from_sq) ^ captured) | (1 << self.ep_square)
+        return not self._attackers(king.bit_length() - 1, color ^ 1, occupied) & ~captured
+
+    def _en_passant_target(self, ep_square: int, mover: int) -> Optional[int]:
+        """Case en passant après l'avance double d'un pion de mover, si un pion adverse peut y prendre"""
+        if PAWN_ATTACKS[mover][ep_square] & self.pieces[mover ^ 1][PAWN_IDX]:
+            return ep_square
+        return None
+
+    def _legal_context(self, color: int) -> Tuple[int, Dict[int, int], int]:
+        """Masques de légalité calculés une fois par position à partir du roi.
+
+        Retourne le masque des cases qui parent l'échec (toutes si le roi
+        n'est pas attaqué, aucune en cas d'échec double), les rayons
+        autorisés des pièces clouées, et les cases attaquées par l'adversaire
+        où le roi ne peut pas aller.
+        """
+        cache = self._legal_cache
+        if cache is not None and cache[0] == color:
+            return cache[1]
+
+        king = self.pieces[color][KING_IDX]
+        if not king:
+            context = (FULL, {}, 0)
+            self._legal_cache = (color, context)
+            return context
+
+        king_sq = king.bit_length() - 1
+        enemy = color ^ 1
+        occupied = self.occupied
+        enemy_pieces = self.pieces[enemy]
+        enemy_occupancy = self.occupancy[enemy]
+
+        # Pièces qui donnent échec
+        checkers = self._attackers(king_sq, enemy, occupied)
+        if not checkers:
+            check_mask = FULL
+        elif checkers & (checkers - 1):
+            check_mask = 0
+        else:
+            checker_sq = checkers.bit_length() - 1
+            check_mask = checkers | BETWEEN[king_sq][checker_sq]
+
+        # Clouages : une seule pièce amie entre le roi et une pièce à longue portée
+        pins = {}
+        queens = enemy_pieces[QUEEN_IDX]
+        snipers = ((rook_attacks(king_sq, enemy_occupancy) & (enemy_pieces[ROOK_IDX] | queens)) |
+                   (bishop_attacks(king_sq, enemy_occupancy) & (enemy_pieces[BISHOP_IDX] | queens)))
+        own = self.occupancy[color]
+        for sniper_sq in squares(snipers):
+            blockers = BETWEEN[king_sq][sniper_sq] & occupied
+            if blockers and not blockers & (blockers - 1) and blockers & own:
+                pins[blockers.bit_length() - 1] = BETWEEN[king_sq][sniper_sq] | (1 << sniper_sq)
+
+        # Cases contrôlées par l'adversaire, roi retiré pour les rayons qui le traversent
+        without_king = occupied ^ king
+        danger = (knight_attacks(enemy_pieces[KNIGHT_IDX]) |
+                  king_attacks(enemy_pieces[KING_IDX]) |
+                  pawn_attacks(enemy_pieces[PAWN_IDX], enemy == WHITE_IDX))
+        for sq in squares(enemy_pieces[ROOK_IDX] | queens):
+            danger |= rook_attacks(sq, without_king)
+        for sq in squares(enemy_pieces[BISHOP_IDX] | queens):
+            danger |= bishop_attacks(sq, without_king)
+
+        context = (check_mask, pins, danger)
+        self._legal_cache = (color, context)
+        return context
+
+    def _attackers(self, sq: int, by_color: int, occupied: int) -> int:
+        """Bitboard des pièces de by_color qui attaquent la case sq"""
+        pieces = self.pieces[by_color]
+        attackers = KNIGHT_ATTACKS[sq] & pieces[KNIGHT_IDX]
+        attackers |= KING_ATTACKS[sq] & pieces[KING_IDX]
+        # Pions qui attaquent sq : attaques d'un pion de l'autre couleur posé en sq
+        attackers |= PAWN_ATTACKS[by_color ^ 1][sq] & pieces[PAWN_IDX]
+        queens = pieces[QUEEN_IDX]
+        attackers |= rook_attacks(sq, occupied) & (pieces[ROOK_IDX] | queens)
+        attackers |= bishop_attacks(sq, occupied) & (pieces[BISHOP_IDX] | queens)
+        return attackers
+
+    def _get_pawn_moves(self, piece: Piece) -> List[Tuple[int, int]]:
+        return self._basic_moves_of(piece, PAWN_IDX)
+
+    def _get_rook_moves(self, piece: Piece) -> List[Tuple[int, int]]:
+        return self._basic_moves_of(piece, ROOK_IDX)
+
+    def _get_knight_moves(self, piece: Piece) -> List[Tuple[int, int]]:
+        return self._basic_moves_of(piece, KNIGHT_IDX)
+
+    def _get_bishop_moves(self, piece: Piece) -> List[Tuple[int, int]]:
+        return self._basic_moves_of(piece, BISHOP_IDX)
+
+    def _get_queen_moves(self, piece: Piece) -> List[Tuple[int, int]]:
+        # La dame combine les mouvements de la tour et du fou
+        return self._basic_moves_of(piece, QUEEN_IDX)
+
+    def _get_king_moves(self, piece: Piece) -> List[Tuple[int, int]]:
+        return self._basic_moves_of(piece, KING_IDX)
+
+    def _basic_moves_of(self, piece: Piece, piece_type: int) -> List[Tuple[int, int]]:
+        targets = self._pseudo_targets(square(piece.row, piece.col), COLOR_INDEX[piece.color], piece_type)
+        return [divmod(sq, 8) for sq in squares(targets)]
+
+    def _is_valid_move_check(self, piece: Piece, move: Tuple[int, int]) -> bool:
+        # Vérifier si le mouvement met le roi en échec
+        from_sq = square(piece.row, piece.col)
+        to_mask = bit(*move)
+        return bool(self._legal_targets(from_sq, COLOR_INDEX[piece.color], PIECE_INDEX[piece.type]) & to_mask)
+
+    def _is_king_in_check(self, color: Color) -> bool:
+        color_idx = COLOR_INDEX[color]
+        king = self.pieces[color_idx][KING_IDX]
+        if not king:
+            return False
+        return bool(self._attackers(king.bit_length() - 1, color_idx ^ 1, self.occupied))
+
+    def _get_basic_moves(self, piece: Piece) -> List[Tuple[int, int]]:
+        # Obtenir les mouvements sans vérification d'échec
+        return self._basic_moves_of(piece, PIECE_INDEX[piece.type])
+
+    def make_move(self, from_pos: Tuple[int, int], to_pos: Tuple[int, int],
+                  promotion: int = QUEEN_IDX) -> bool:
+        """Joue le coup désigné par deux cases (promotion en dame par défaut)"""
+        move = self.find_move(from_pos, to_pos, promotion)
+        if move is None:
+            return False
+        return self.play(move)
+
+    def play(self, move: Move) -> bool:
+        """Joue un coup encodé s'il est légal, et détecte la fin de partie"""
+        if move not in self.get_all_valid_moves(self.current_player):
+            return False
+
+        self.push(move)
+        self._update_game_over()
+        return True
+
+    def _update_game_over(self):
+        """Déclare la fin de partie : mat, pat, ou nulle par une règle (voir draw_reason)"""
+        if not self._has_legal_move(self.side):
+            in_check = self._is_king_in_check(self.current_player)
+            self.end_reason = "mat" if in_check else "pat"
+            self.winner = COLORS[self.side ^ 1] if in_check else None
+        else:
+            self.end_reason = self.draw_reason()
+            self.winner = None
+        self.game_over = self.end_reason is not None
+
+    def draw_reason(self) -> Optional[str]:
+        """Règle de nulle qui s'applique à la position courante (hors pat), ou None"""
+        if self.halfmove >= FIFTY_MOVE_PLIES:
+            return "cinquante coups"
+        if self.repetition_count() >= 3:
+            return "répétition"
+        if self.insufficient_material():
+            return "matériel insuffisant"
+        return None
+
+    def repetition_count(self, limit: int = 3) -> int:
+        """Occurrences de la position courante dans la partie, elle comprise (au plus limit).
+
+        Seules les positions depuis la dernière prise ou le dernier coup de
+        pion, avec le même camp au trait, sont comparées par leur clé de
+        Zobrist ; un coup nul de la recherche interrompt la comparaison.
+        """
+        history = self.move_history
+        key = self.zobrist_key
+        count = 1
+        for back in range(2, min(self.halfmove, len(history)) + 1, 2):
+            if history[-back + 1][0] == NULL_MOVE or history[-back][0] == NULL_MOVE:
+                break
+            if history[-back][7] == key:
+                count += 1
+                if count >= limit:
+                    break
+        return count
+
+    def insufficient_material(self) -> bool:
+        """Rois seuls, un seul cavalier en plus des rois, ou des fous tous de la même couleur de case"""
+        white, black = self.pieces
+        if (white[PAWN_IDX] | white[ROOK_IDX] | white[QUEEN_IDX]
+                | black[PAWN_IDX] | black[ROOK_IDX] | black[QUEEN_IDX]):
+            return False
+        knights = white[KNIGHT_IDX] | black[KNIGHT_IDX]
+        bishops = white[BISHOP_IDX] | black[BISHOP_IDX]
+        if knights:
+            return not bishops and popcount(knights) == 1
+        return not bishops & LIGHT_SQUARES or not bishops & ~LIGHT_SQUARES
+
+    def push(self, move: Move):
+        """Joue un coup sur place, sans vérifier sa légalité ni la fin de partie.
+
+        Les informations nécessaires pour l'annuler sont ajoutées à
+        ``move_history`` ; ``pop()`` restaure la position précédente.
+        """
+        from_sq = (move >> 6) & 63
+        to_sq = move & 63
+        key = self.zobrist_key
+
+        # Effectuer le mouvement
+        moved = self._remove_piece(from_sq)
+        color, piece_type = moved
+        if move & MOVE_EN_PASSANT:
+            captured = self._remove_piece(to_sq + 8 if color == WHITE_IDX else to_sq - 8)
+        else:
+            captured = self._remove_piece(to_sq)
+
+        # Promotion du pion
+        promotion = (move >> MOVE_PROMOTION_SHIFT) & 7
+        self._put_piece(to_sq, color, promotion or piece_type)
+
+        # Enregistrer le mouvement avec de quoi l'annuler
+        self.move_history.append((move, captured, moved, self.unmoved, self._legal_cache,
+                                  self.ep_square, self.halfmove, key))
+        touched = (1 << from_sq) | (1 << to_sq)
+        if piece_type == KING_IDX and to_sq - from_sq in (2, -2):
+            # Roque : la tour passe de l'autre côté du roi
+            rook_from, rook_to = CASTLING_ROOKS[to_sq]
+            self._put_piece(rook_to, *self._remove_piece(rook_from))
+            touched |= 1 << rook_from
+        if self.unmoved & CASTLING_SQUARES & touched:
+            self.zobrist_key ^= (ZOBRIST_CASTLING[castling_rights(self.unmoved)]
+                                 ^ ZOBRIST_CASTLING[castling_rights(self.unmoved & ~touched)])
+        self.unmoved &= ~touched
+        self._grid = None
+        self._legal_cache = None
+
+        if self.ep_square is not None:
+            self.zobrist_key ^= ZOBRIST_EN_PASSANT[self.ep_square & 7]
+            self.ep_square = None
+        if piece_type == PAWN_IDX:
+            self.halfmove = 0
+            if to_sq - from_sq in (16, -16):
+                self.ep_square = self._en_passant_target((from_sq + to_sq) >> 1, color)
+                if self.ep_square is not None:
+                    self.zobrist_key ^= ZOBRIST_EN_PASSANT[self.ep_square & 7]
+        else:
+            self.halfmove = 0 if captured is not None else self.halfmove + 1
+
+        # Changer de joueur
+        self.side = color ^ 1
+        self.zobrist_key ^= ZOBRIST_BLACK_TO_MOVE
+
+    def pop(self) -> Move:
+        """Annule le dernier coup joué et le retourne"""
+        move, captured, moved, unmoved, legal_cache, ep_square, halfmove, key = self.move_history.pop()
+        # Les masques de légalité de la position restaurée restent valables
+        self._legal_cache = legal_cache
+        self.ep_square = ep_square
+        self.halfmove = halfmove
+        if move == NULL_MOVE:
+            self.side ^= 1
+            self.zobrist_key = key
+            return move
+        from_sq = (move >> 6) & 63
+        to_sq = move & 63
+
+        self._remove_piece(to_sq)
+        if captured is not None:
+            if move & MOVE_EN_PASSANT:
+                self._put_piece(to_sq + 8 if moved[0] == WHITE_IDX else to_sq - 8, *captured)
+            else:
+                self._put_piece(to_sq, *captured)
+        self._put_piece(from_sq, *moved)
+        if moved[1] == KING_IDX and to_sq - from_sq in (2, -2):
+            rook_from, rook_to = CASTLING_ROOKS[to_sq]
+            self._put_piece(rook_from, *self._remove_piece(rook_to))
+        self.unmoved = unmoved
+        self.zobrist_key = key
+        self._grid = None
+
+        # Une position d'où un coup a été joué n'était pas terminée
+        self.side = moved[0]
+        self.game_over = False
+        self.winner = None
+        self.end_reason = None
+        return move
+
+    def push_null(self):
+        """Passe le trait sans jouer (coup nul de la recherche), annulé par pop()"""
+        self.move_history.append((NULL_MOVE, None, None, self.unmoved, self._legal_cache,
+                                  self.ep_square, self.halfmove, self.zobrist_key))
+        self._legal_cache = None
+        if self.ep_square is not None:
+            self.zobrist_key ^= ZOBRIST_EN_PASSANT[self.ep_square & 7]
+            self.ep_square = None
+        self.side ^= 1
+        self.zobrist_key ^= ZOBRIST_BLACK_TO_MOVE
+
+    def _is_checkmate(self, color: Color) -> bool:
+        if not self._is_king_in_check(color):
+            return False
+
+        # Vérifier si le joueur a des mouvements légaux
+        return not self._has_legal_move(COLOR_INDEX[color])
+
+    def _has_legal_move(self, color_idx: int) -> bool:
+        for from_sq in squares(self.occupancy[color_idx]):
+            if self._legal_targets(from_sq, color_idx, self.mailbox[from_sq][1]):
+                return True
+        return False
+
+    def select_piece(self, row: int, col: int):
+        piece = self.board[row][col]
+        if piece and piece.color == self.current_player:
+            self.selected_piece = piece
+            self.valid_moves = self.get_valid_moves(piece)
+        else:
+            self.selected_piece = None
+            self.valid_moves = []
@@ -1,13 +1,24 @@
 import pygame
 import sys
 import math
+import os
+import threading
 from enum import Enum
-from typing import List, Tuple, Optional, Dict
+from typing import Tuple
+
+# Le moteur est importable sans pygame ; réexporté ici pour les anciens imports
+from chess_engine import ChessBoard, Color, PieceType, Piece
+from chess_ai import ChessAI
+from pgn import read_games, write_game
+from book import OpeningBook
+from tablebase import DEFAULT_DIRECTORY as TABLEBASE_DIR, Tablebases
 
 # Initialisation de Pygame
 pygame.init()
 
 # Constantes
+SAVE_FILE = "partie.pgn"  # Partie sauvegardée par S et rechargée par L
+BOOK_FILE = "book.bin"  # Bibliothèque d'ouvertures de l'IA, si elle existe (voir book.py)
 BOARD_SIZE = 640
 CELL_SIZE = BOARD_SIZE // 8
 WINDOW_WIDTH = BOARD_SIZE + 300  # Espace pour l'interface
@@ -32,29 +43,6 @@ class GameState(Enum):
     PLAYING = "playing"
     GAME_OVER = "game_over"
 
-class PieceType(Enum):
-    PAWN = "pawn"
-    ROOK = "rook"
-    KNIGHT = "knight"
-    BISHOP = "bishop"
-    QUEEN = "queen"
-    KING = "king"
-
-class Color(Enum):
-    WHITE = "white"
-    BLACK = "black"
-
-class Piece:
-    def __init__(self, piece_type: PieceType, color: Color, row: int, col: int):
-        self.type = piece_type
-        self.color = color
-        self.row = row
-        self.col = col
-        self.has_moved = False
-
-    def __str__(self):
-        return f"{self.color.value}_{self.type.value}"
-
 class MenuButton:
     def __init__(self, x, y, width, height, text, font):
         self.rect = pygame.Rect(x, y, width, height)
@@ -79,292 +67,6 @@ class MenuButton:
                 return True
         return False
 
-class ChessBoard:
-    def __init__(self):
-        self.board = [[None for _ in range(8)] for _ in range(8)]
-        self.current_player = Color.WHITE
-        self.game_over = False
-        self.winner = None
-        self.selected_piece = None
-        self.valid_moves = []
-        self.move_history = []
-        self.king_positions = {Color.WHITE: (7, 4), Color.BLACK: (0, 4)}
-        self.setup_board()
-
-    def setup_board(self):
-        # Placement des pions
-        for col in range(8):
-            self.board[1][col] = Piece(PieceType.PAWN, Color.BLACK, 1, col)
-            self.board[6][col] = Piece(PieceType.PAWN, Color.WHITE, 6, col)
-
-        # Placement des pièces noires
-        piece_order = [PieceType.ROOK, PieceType.KNIGHT, PieceType.BISHOP, 
-                      PieceType.QUEEN, PieceType.KING, PieceType.BISHOP, 
-                      PieceType.KNIGHT, PieceType.ROOK]
-        
-        for col, piece_type in enumerate(piece_order):
-            self.board[0][col] = Piece(piece_type, Color.BLACK, 0, col)
-            self.board[7][col] = Piece(piece_type, Color.WHITE, 7, col)
-
-    def get_valid_moves(self, piece: Piece) -> List[Tuple[int, int]]:
-        moves = []
-        row, col = piece.row, piece.col
-
-        if piece.type == PieceType.PAWN:
-            moves = self._get_pawn_moves(piece)
-        elif piece.type == PieceType.ROOK:
-            moves = self._get_rook_moves(piece)
-        elif piece.type == PieceType.KNIGHT:
-            moves = self._get_knight_moves(piece)
-        elif piece.type == PieceType.BISHOP:
-            moves = self._get_bishop_moves(piece)
-        elif piece.type == PieceType.QUEEN:
-            moves = self._get_queen_moves(piece)
-        elif piece.type == PieceType.KING:
-            moves = self._get_king_moves(piece)
-
-        # Filtrer les mouvements qui mettent le roi en échec
-        valid_moves = []
-        for move in moves:
-            if self._is_valid_move_check(piece, move):
-                valid_moves.append(move)
-
-        return valid_moves
-
-    def _get_pawn_moves(self, piece: Piece) -> List[Tuple[int, int]]:
-        moves = []
-        row, col = piece.row, piece.col
-        direction = -1 if piece.color == Color.WHITE else 1
-
-        # Mouvement d'une case
-        new_row = row + direction
-        if 0 <= new_row < 8 and self.board[new_row][col] is None:
-            moves.append((new_row, col))
-            
-            # Mouvement de deux cases (premier mouvement)
-            if not piece.has_moved:
-                new_row2 = row + 2 * direction
-                if 0 <= new_row2 < 8 and self.board[new_row2][col] is None:
-                    moves.append((new_row2, col))
-
-        # Captures en diagonale
-        for dc in [-1, 1]:
-            new_row, new_col = row + direction, col + dc
-            if 0 <= new_row < 8 and 0 <= new_col < 8:
-                target = self.board[new_row][new_col]
-                if target and target.color != piece.color:
-                    moves.append((new_row, new_col))
-
-        return moves
-
-    def _get_rook_moves(self, piece: Piece) -> List[Tuple[int, int]]:
-        moves = []
-        directions = [(0, 1), (0, -1), (1, 0), (-1, 0)]
-        
-        for dr, dc in directions:
-            for i in range(1, 8):
-                new_row = piece.row + dr * i
-                new_col = piece.col + dc * i
-                
-                if not (0 <= new_row < 8 and 0 <= new_col < 8):
-                    break
-                
-                target = self.board[new_row][new_col]
-                if target is None:
-                    moves.append((new_row, new_col))
-                elif target.color != piece.color:
-                    moves.append((new_row, new_col))
-                    break
-                else:
-                    break
-        
-        return moves
-
-    def _get_knight_moves(self, piece: Piece) -> List[Tuple[int, int]]:
-        moves = []
-        knight_moves = [(-2, -1), (-2, 1), (-1, -2), (-1, 2),
-                       (1, -2), (1, 2), (2, -1), (2, 1)]
-        
-        for dr, dc in knight_moves:
-            new_row = piece.row + dr
-            new_col = piece.col + dc
-            
-            if 0 <= new_row < 8 and 0 <= new_col < 8:
-                target = self.board[new_row][new_col]
-                if target is None or target.color != piece.color:
-                    moves.append((new_row, new_col))
-        
-        return moves
-
-    def _get_bishop_moves(self, piece: Piece) -> List[Tuple[int, int]]:
-        moves = []
-        directions = [(1, 1), (1, -1), (-1, 1), (-1, -1)]
-        
-        for dr, dc in directions:
-            for i in range(1, 8):
-                new_row = piece.row + dr * i
-                new_col = piece.col + dc * i
-                
-                if not (0 <= new_row < 8 and 0 <= new_col < 8):
-                    break
-                
-                target = self.board[new_row][new_col]
-                if target is None:
-                    moves.append((new_row, new_col))
-                elif target.color != piece.color:
-                    moves.append((new_row, new_col))
-                    break
-                else:
-                    break
-        
-        return moves
-
-    def _get_queen_moves(self, piece: Piece) -> List[Tuple[int, int]]:
-        # La dame combine les mouvements de la tour et du fou
-        return self._get_rook_moves(piece) + self._get_bishop_moves(piece)
-
-    def _get_king_moves(self, piece: Piece) -> List[Tuple[int, int]]:
-        moves = []
-        directions = [(0, 1), (0, -1), (1, 0), (-1, 0),
-                     (1, 1), (1, -1), (-1, 1), (-1, -1)]
-        
-        for dr, dc in directions:
-            new_row = piece.row + dr
-            new_col = piece.col + dc
-            
-            if 0 <= new_row < 8 and 0 <= new_col < 8:
-                target = self.board[new_row][new_col]
-                if target is None or target.color != piece.color:
-                    moves.append((new_row, new_col))
-        
-        return moves
-
-    def _is_valid_move_check(self, piece: Piece, move: Tuple[int, int]) -> bool:
-        # Simuler le mouvement pour vérifier s'il met le roi en échec
-        old_row, old_col = piece.row, piece.col
-        new_row, new_col = move
-        
-        # Sauvegarder l'état
-        captured_piece = self.board[new_row][new_col]
-        
-        # Faire le mouvement temporaire
-        self.board[old_row][old_col] = None
-        self.board[new_row][new_col] = piece
-        piece.row, piece.col = new_row, new_col
-        
-        # Mettre à jour la position du roi si nécessaire
-        if piece.type == PieceType.KING:
-            old_king_pos = self.king_positions[piece.color]
-            self.king_positions[piece.color] = (new_row, new_col)
-        
-        # Vérifier si le roi est en échec
-        is_valid = not self._is_king_in_check(piece.color)
-        
-        # Restaurer l'état
-        self.board[old_row][old_col] = piece
-        self.board[new_row][new_col] = captured_piece
-        piece.row, piece.col = old_row, old_col
-        
-        if piece.type == PieceType.KING:
-            self.king_positions[piece.color] = (old_row, old_col)
-        
-        return is_valid
-
-    def _is_king_in_check(self, color: Color) -> bool:
-        king_row, king_col = self.king_positions[color]
-        enemy_color = Color.BLACK if color == Color.WHITE else Color.WHITE
-        
-        # Vérifier si une pièce ennemie peut attaquer le roi
-        for row in range(8):
-            for col in range(8):
-                piece = self.board[row][col]
-                if piece and piece.color == enemy_color:
-                    enemy_moves = self._get_basic_moves(piece)
-                    if (king_row, king_col) in enemy_moves:
-                        return True
-        return False
-
-    def _get_basic_moves(self, piece: Piece) -> List[Tuple[int, int]]:
-        # Obtenir les mouvements sans vérification d'échec pour éviter la récursion
-        if piece.type == PieceType.PAWN:
-            return self._get_pawn_moves(piece)
-        elif piece.type == PieceType.ROOK:
-            return self._get_rook_moves(piece)
-        elif piece.type == PieceType.KNIGHT:
-            return self._get_knight_moves(piece)
-        elif piece.type == PieceType.BISHOP:
-            return self._get_bishop_moves(piece)
-        elif piece.type == PieceType.QUEEN:
-            return self._get_queen_moves(piece)
-        elif piece.type == PieceType.KING:
-            return self._get_king_moves(piece)
-        return []
-
-    def make_move(self, from_pos: Tuple[int, int], to_pos: Tuple[int, int]) -> bool:
-        from_row, from_col = from_pos
-        to_row, to_col = to_pos
-        
-        piece = self.board[from_row][from_col]
-        if not piece or piece.color != self.current_player:
-            return False
-        
-        if to_pos not in self.get_valid_moves(piece):
-            return False
-        
-        # Effectuer le mouvement
-        captured_piece = self.board[to_row][to_col]
-        self.board[from_row][from_col] = None
-        self.board[to_row][to_col] = piece
-        piece.row, piece.col = to_row, to_col
-        piece.has_moved = True
-        
-        # Mettre à jour la position du roi
-        if piece.type == PieceType.KING:
-            self.king_positions[piece.color] = (to_row, to_col)
-        
-        # Promotion du pion
-        if piece.type == PieceType.PAWN:
-            if (piece.color == Color.WHITE and to_row == 0) or \
-               (piece.color == Color.BLACK and to_row == 7):
-                # Promotion automatique en dame
-                piece.type = PieceType.QUEEN
-        
-        # Enregistrer le mouvement
-        self.move_history.append((from_pos, to_pos, captured_piece))
-        
-        # Changer de joueur
-        self.current_player = Color.BLACK if self.current_player == Color.WHITE else Color.WHITE
-        
-        # Vérifier l'échec et mat
-        if self._is_checkmate(self.current_player):
-            self.game_over = True
-            self.winner = Color.BLACK if self.current_player == Color.WHITE else Color.WHITE
-        
-        return True
-
-    def _is_checkmate(self, color: Color) -> bool:
-        if not self._is_king_in_check(color):
-            return False
-        
-        # Vérifier si le joueur a des mouvements légaux
-        for row in range(8):
-            for col in range(8):
-                piece = self.board[row][col]
-                if piece and piece.color == color:
-                    if self.get_valid_moves(piece):
-                        return False
-        
-        return True
-
-    def select_piece(self, row: int, col: int):
-        piece = self.board[row][col]
-        if piece and piece.color == self.current_player:
-            self.selected_piece = piece
-            self.valid_moves = self.get_valid_moves(piece)
-        else:
-            self.selected_piece = None
-            self.valid_moves = []
-
 class ChessGame:
     def __init__(self):
         self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
@@ -380,6 +82,22 @@ class ChessGame:
         self.ai_difficulty = 3
         self.ai_thinking = False
         
+        # Une seule IA pour toute la partie : sa table de transposition
+        # sert d'un coup à l'autre. La recherche tourne en arrière-plan.
+        book = None
+        if os.path.exists(BOOK_FILE):
+            try:
+                book = OpeningBook(BOOK_FILE, random_choice=True)
+            except ValueError as error:
+                # Bibliothèque d'une ancienne version : on joue sans plutôt que de planter
+                print(f"{error} ; bibliothèque ignorée (régénérer avec book.py)", file=sys.stderr)
+        # Tables de finales générées par tablebase.py, si elles existent
+        tablebase = Tablebases(TABLEBASE_DIR)
+        self.ai = ChessAI(self.ai_difficulty, book=book, tablebase=tablebase if tablebase.names else None)
+        self.ai_thread = None
+        self.ai_stop = None
+        self.ai_move = None
+        
         # Boutons du menu
         self.setup_menu()
 
@@ -555,7 +273,10 @@ class ChessGame:
         self.screen.blit(player_surface, (BOARD_SIZE + 10, 70))
         
         if self.board.game_over:
-            winner_text = f"Victoire: {'Blanc' if self.board.winner == Color.WHITE else 'Noir'}!"
+            if self.board.winner is None:
+                winner_text = f"Nulle: {self.board.end_reason}"
+            else:
+                winner_text = f"Victoire: {'Blanc' if self.board.winner == Color.WHITE else 'Noir'}!"
             winner_surface = self.font.render(winner_text, True, (255, 215, 0))
             self.screen.blit(winner_surface, (BOARD_SIZE + 10, 110))
         elif self.board._is_king_in_check(self.board.current_player):
@@ -571,18 +292,27 @@ class ChessGame:
                 thinking_text = "IA réfléchit..."
                 thinking_surface = self.small_font.render(thinking_text, True, (255, 255, 0))
                 self.screen.blit(thinking_surface, (BOARD_SIZE + 10, 170))
+                
+                # Progression : dernière profondeur terminée et nœuds visités
+                depth = self.ai.last_search_info.get("depth", 0)
+                progress_text = f"Profondeur {depth}, {self.ai.nodes} nœuds"
+                progress_surface = self.small_font.render(progress_text, True, (255, 255, 0))
+                self.screen.blit(progress_surface, (BOARD_SIZE + 10, 190))
     
         instructions = [
             "Instructions:",
             "- Clic: Sélectionner/Bouger",
+            "- Espace: Forcer le coup de l'IA",
+            "- 1-5: Difficulté de l'IA",
             "- R: Nouvelle partie", 
+            "- S/L: Sauvegarder/Charger (PGN)",
             "- M: Retour au menu",
             "- Q: Quitter"
         ]
         
         for i, instruction in enumerate(instructions):
             inst_surface = self.small_font.render(instruction, True, TEXT_COLOR)
-            self.screen.blit(inst_surface, (BOARD_SIZE + 10, 200 + i * 25))
+            self.screen.blit(inst_surface, (BOARD_SIZE + 10, 220 + i * 25))
 
     def handle_menu_events(self, event):
         if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
@@ -613,11 +343,32 @@ class ChessGame:
                 button.handle_event(event)
 
     def start_game(self, ai_enabled):
+        self.cancel_ai_move()
+        self.ai.set_difficulty(self.ai_difficulty)
+        self.ai.new_game()
         self.ai_enabled = ai_enabled
         self.board = ChessBoard()
         self.state = GameState.PLAYING
         self.show_difficulty = False
 
+    def save_game(self, path: str = SAVE_FILE):
+        with open(path, "w", encoding="utf-8") as stream:
+            write_game(stream, self.board, {"White": "Joueur",
+                                            "Black": "IA" if self.ai_enabled else "Joueur"})
+        print(f"Partie sauvegardée dans {path}")
+
+    def load_game(self, path: str = SAVE_FILE):
+        """Remplace la partie en cours par la première partie du fichier"""
+        try:
+            with open(path, encoding="utf-8") as stream:
+                board = next(read_games(stream)).board()
+        except (OSError, StopIteration, ValueError) as error:
+            print(f"Impossible de charger {path} : {error or 'aucune partie'}")
+            return
+        self.cancel_ai_move()
+        self.ai.new_game()
+        self.board = board
+
     def handle_click(self, pos: Tuple[int, int]):
         x, y = pos
         if x >= BOARD_SIZE:
@@ -641,13 +392,41 @@ class ChessGame:
             self.board.select_piece(row, col)
 
     def handle_ai_move(self):
+        """Lance la recherche de l'IA dans un thread pour ne pas bloquer l'affichage"""
         if self.ai_enabled and self.board.current_player == Color.BLACK and not self.board.game_over:
-            # Import ici pour éviter les problèmes de dépendance circulaire
-            from chess_ai import get_ai_move
-            move = get_ai_move(self.board, self.ai_difficulty)
-            if move:
-                from_pos, to_pos = move
-                self.board.make_move(from_pos, to_pos)
+            # L'IA joue et annule des coups : elle travaille sur une copie du plateau
+            self.ai_stop = threading.Event()
+            self.ai_move = None
+            self.ai_thinking = True
+            self.ai_thread = threading.Thread(target=self._search_ai_move,
+                                              args=(self.ai, self.board.copy(), self.ai_stop),
+                                              daemon=True)
+            self.ai_thread.start()
+
+    def _search_ai_move(self, ai: ChessAI, board: ChessBoard, stop: threading.Event):
+        self.ai_move = ai.get_best_move(board, stop_event=stop)
+
+    def update_ai_move(self):
+        """Joue le coup de l'IA dès que la recherche est terminée"""
+        if self.ai_thinking and not self.ai_thread.is_alive():
+            self.ai_thinking = False
+            if self.ai_move is not None:
+                # Coup encodé en entier, joué tel quel (promotion comprise)
+                self.board.play(self.ai_move)
+            self.ai_move = None
+
+    def force_ai_move(self):
+        """Arrête la recherche : l'IA joue le meilleur coup trouvé jusqu'ici"""
+        if self.ai_thinking:
+            self.ai_stop.set()
+
+    def cancel_ai_move(self):
+        """Arrête la recherche sans jouer de coup"""
+        if self.ai_thinking:
+            self.ai_stop.set()
+            self.ai_thread.join()
+            self.ai_thinking = False
+            self.ai_move = None
 
     def run(self):
         running = True
@@ -668,14 +447,28 @@ class ChessGame:
                             self.handle_click(event.pos)
                     elif event.type == pygame.KEYDOWN:
                         if event.key == pygame.K_r:
+                            self.cancel_ai_move()
+                            self.ai.new_game()
                             self.board = ChessBoard()
+                        elif event.key == pygame.K_s and not self.ai_thinking:
+                            self.save_game()
+                        elif event.key == pygame.K_l:
+                            self.load_game()
+                        elif pygame.K_1 <= event.key <= pygame.K_5:
+                            # Prise en compte à la prochaine recherche
+                            self.ai_difficulty = event.key - pygame.K_0
+                            self.ai.set_difficulty(self.ai_difficulty)
+                        elif event.key == pygame.K_SPACE:
+                            self.force_ai_move()
                         elif event.key == pygame.K_m:
+                            self.cancel_ai_move()
                             self.state = GameState.MENU
                             self.setup_menu()
                         elif event.key == pygame.K_q:
                             running = False
             
-            # IA automatique
+            # IA automatique, en arrière-plan
+            self.update_ai_move()
             if (self.state == GameState.PLAYING and 
                 self.ai_enabled and 
                 self.board.current_player == Color.BLACK and 
@@ -695,6 +488,7 @@ class ChessGame:
             pygame.display.flip()
             self.clock.tick(60)
         
+        self.cancel_ai_move()
         pygame.quit()
         sys.exit()
 
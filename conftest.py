@@ -0,0 +1 @@
+"""Configuration de pytest : les modules du moteur sont à la racine du dépôt."""
@@ -0,0 +1,267 @@
+"""
+Recherche parallèle sur plusieurs processus pour ChessAI.
+
+Deux modes :
+
+- ``"root"`` : les coups de la racine sont répartis entre les processus.
+  Le premier coup (meilleur coup de l'itération précédente) est cherché
+  seul pour obtenir une borne, puis les autres en parallèle avec cette
+  borne. Les processus cherchent avec les options de l'IA appelante et les
+  coups de la racine ne sont pas réduits : à profondeur égale, le score est
+  celui de la recherche séquentielle (tests/test_parallel.py). Entre coups
+  de score égal, le choix peut différer, l'ordre des coups n'étant pas
+  exactement le même.
+- ``"lazy"`` : le processus principal cherche normalement pendant que des
+  processus auxiliaires cherchent la même position (une profondeur sur deux
+  un cran plus loin) ; tous partagent une table de transposition en mémoire
+  partagée (Lazy SMP). Plus rapide, mais non déterministe.
+"""
+
+import math
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from chess_ai import MATE_SCORE, ChessAI
+from chess_engine import ChessBoard, Color, Move
+from tablebase import Tablebases
+from transposition import SharedTranspositionTable
+
+PARALLEL_MODES = ("root", "lazy")
+
+# IA propre à chaque processus de calcul, créée par init_worker
+_worker_ai: Optional[ChessAI] = None
+_worker_stop = None
+# Nœuds cherchés par tous les processus depuis le début de la recherche en cours
+_worker_nodes = None
+# Dernières partie et recherche vues par le processus (voir _begin_search)
+_worker_game: Optional[int] = None
+_worker_search: Optional[int] = None
+
+def init_worker(difficulty: int, hash_size_mb: float, shared_table_name: Optional[str] = None,
+                stop_event=None, node_counter=None, options: Optional[Dict] = None,
+                tablebase_dir: Optional[str] = None):
+    """Initialiseur des processus de calcul : une IA par processus (voir worker_ai).
+
+    Sert aussi à analyze.py, qui n'utilise ni table partagée, ni arrêt, ni compteur.
+    """
+    global _worker_ai, _worker_stop, _worker_nodes
+    table = None
+    if shared_table_name is not None:
+        table = SharedTranspositionTable.attach(shared_table_name, hash_size_mb)
+    # Les tables de finales sont rouvertes par chemin : une projection mémoire ne se transmet pas
+    tablebase = Tablebases(tablebase_dir) if tablebase_dir is not None else None
+    _worker_ai = ChessAI(difficulty, hash_size_mb, transposition_table=table, tablebase=tablebase,
+                         **(options or {}))
+    _worker_stop = stop_event
+    _worker_nodes = node_counter
+
+def worker_ai() -> ChessAI:
+    """IA du processus de calcul courant, créée par init_worker"""
+    return _worker_ai
+
+def _begin_search(game: int, search: Optional[int] = None):
+    """Met l'IA du processus à jour avant une tâche.
+
+    Nouvelle partie : table et ordre des coups oubliés, sauf la table
+    partagée, déjà vidée par le processus principal. Nouvelle recherche :
+    table et ordre des coups vieillis, comme le fait iterative_deepening.
+    """
+    global _worker_game, _worker_search
+    if game != _worker_game:
+        _worker_game = game
+        if isinstance(_worker_ai.transposition_table, SharedTranspositionTable):
+            _worker_ai.clear_move_ordering()
+        else:
+            _worker_ai.new_game()
+    if search is not None and search != _worker_search:
+        _worker_search = search
+        _worker_ai.transposition_table.new_search()
+        _worker_ai._age_move_ordering()
+
+def _search_root_move(game: int, search: int, board: ChessBoard, move: Move, depth: int, alpha: float, beta: float,
+                      deadline: Optional[float], node_limit: Optional[int] = None, shares: int = 1,
+                      stoppable: bool = True) -> Tuple[Optional[float], int]:
+    """Score d'un coup de la racine et nœuds cherchés.
+
+    ``node_limit`` est le budget de toute la recherche : la tâche en reçoit
+    la part ``1 / shares`` de ce qui reste au moment où elle commence.
+    """
+    _begin_search(game, search)
+    if node_limit is not None:
+        node_limit = (node_limit - _worker_nodes.value) // shares
+    if stoppable and (_worker_stop.is_set() or (deadline is not None and time.time() >= deadline)
+                      or (node_limit is not None and node_limit <= 0)):
+        return None, 0  # Budget épuisé avant le début : coup abandonné sans recherche
+    time_limit = deadline - time.time() if deadline is not None else None
+    stop = _worker_stop if stoppable else None
+    score = _worker_ai.search_move(board, move, depth, alpha, beta, time_limit, stop, node_limit)
+    with _worker_nodes.get_lock():
+        _worker_nodes.value += _worker_ai.nodes
+    return score, _worker_ai.nodes
+
+def _lazy_helper(game: int, board: ChessBoard, depth: int, deadline: Optional[float],
+                 node_limit: Optional[int] = None) -> int:
+    # La recherche vieillit elle-même l'ordre des coups ; la génération commune est avancée par le principal
+    _begin_search(game)
+    time_limit = deadline - time.time() if deadline is not None else None
+    _worker_ai.iterative_deepening(board, depth, time_limit, node_limit, _worker_stop)
+    return _worker_ai.nodes
+
+class ParallelSearch:
+    """Groupe de processus de recherche, conservé d'un coup à l'autre"""
+
+    def __init__(self, workers: int, difficulty: int = 3, hash_size_mb: float = 16, mode: str = "root",
+                 options: Optional[Dict] = None, tablebase: Optional[Tablebases] = None):
+        if mode not in PARALLEL_MODES:
+            raise ValueError(f"Mode de recherche parallèle inconnu : {mode}")
+        self.workers = workers
+        self.mode = mode
+        self.last_search_info = {}
+        # Numéros de la partie et de la recherche en cours, transmis aux processus avec chaque tâche
+        self._game_id = 0
+        self._search_id = 0
+        # Tâches de la recherche en cours, annulées si elle est interrompue
+        self._pending = []
+        context = multiprocessing.get_context()
+        self._stop = context.Event()
+        self._nodes = context.Value("q", 0)
+        self.shared_table = SharedTranspositionTable(hash_size_mb) if mode == "lazy" else None
+        # Mêmes options de recherche partout que dans l'IA séquentielle (ChessAI.search_options)
+        options = options or {}
+        # Le processus principal trie les coups (mode root) ou cherche lui-même (mode lazy)
+        self.ai = ChessAI(difficulty, hash_size_mb, transposition_table=self.shared_table,
+                          tablebase=tablebase, **options)
+        pool_size = workers if mode == "root" else workers - 1
+        shared_name = self.shared_table.name if self.shared_table is not None else None
+        tablebase_dir = tablebase.directory if tablebase is not None else None
+        self.pool = ProcessPoolExecutor(pool_size, mp_context=context, initializer=init_worker,
+                                        initargs=(difficulty, hash_size_mb, shared_name, self._stop,
+                                                  self._nodes, options, tablebase_dir))
+
+    def set_difficulty(self, difficulty: int):
+        self.ai.set_difficulty(difficulty)
+
+    def new_game(self):
+        # Les processus se remettent à zéro à leur prochaine tâche (voir _begin_search)
+        self._game_id += 1
+        self.ai.new_game()
+
+    def close(self):
+        # Tâches en attente abandonnées : shutdown(cancel_futures=True) demande Python 3.9
+        self._stop.set()
+        for future in self._pending:
+            future.cancel()
+        self.pool.shutdown(wait=True)
+        if self.shared_table is not None:
+            self.shared_table.close()
+            self.shared_table = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def search(self, board: ChessBoard, max_depth: int, time_limit: Optional[float] = None,
+               stop_event=None, node_limit: Optional[int] = None) -> Tuple[float, Optional[Move]]:
+        """Retourne (score, meilleur coup) de la dernière profondeur terminée"""
+        self._stop.clear()
+        self._nodes.value = 0
+        self._search_id += 1
+        start = time.time()
+        deadline = start + time_limit if time_limit is not None else None
+        if self.mode == "lazy":
+            return self._search_lazy(board, max_depth, time_limit, deadline, stop_event, start, node_limit)
+        return self._search_root(board, max_depth, deadline, stop_event, start, node_limit)
+
+    def _search_root(self, board: ChessBoard, max_depth: int, deadline: Optional[float],
+                     stop_event, start: float, node_limit: Optional[int] = None):
+        maximizing = board.current_player == Color.BLACK
+        moves = self.ai.order_moves(board, board.get_all_valid_moves(board.current_player))
+        if not moves:
+            score, _ = self.ai.minimax(board, 1, -math.inf, math.inf, maximizing)
+            return score, None
+
+        best_score, best_move, completed_depth, nodes = None, None, 0, 0
+        for depth in range(1, max_depth + 1):
+            # Même ordre qu'en séquentiel : meilleur coup de l'itération précédente d'abord
+            if best_move is not None:
+                moves.remove(best_move)
+                moves.insert(0, best_move)
+            budget = self._root_budget(depth, deadline, node_limit, 1)
+            score, searched = self.pool.submit(_search_root_move, self._game_id, self._search_id, board, moves[0],
+                                               depth, -math.inf, math.inf, *budget).result()
+            nodes += searched
+            if score is None:
+                break
+            depth_score, depth_move = score, moves[0]
+
+            # Les autres coups avec la borne du premier : seul un score strictement
+            # meilleur est exact, comme dans l'alpha-beta séquentiel
+            alpha, beta = (score, math.inf) if maximizing else (-math.inf, score)
+            budget = self._root_budget(depth, deadline, node_limit, min(self.workers, len(moves) - 1))
+            futures = self._pending = [self.pool.submit(_search_root_move, self._game_id, self._search_id, board,
+                                                        move, depth, alpha, beta, *budget)
+                                       for move in moves[1:]]
+            complete = True
+            for move, future in zip(moves[1:], futures):
+                if stop_event is not None and stop_event.is_set():
+                    self._stop.set()
+                score, searched = future.result()
+                nodes += searched
+                if score is None:
+                    # Profondeur inachevée : les coups restants sont abandonnés sans recherche
+                    complete = False
+                    self._stop.set()
+                elif (score > depth_score) if maximizing else (score < depth_score):
+                    depth_score, depth_move = score, move
+            if not complete:
+                break
+
+            best_score, best_move, completed_depth = depth_score, depth_move, depth
+            self.last_search_info = self._info(completed_depth, best_score, nodes, start)
+            if abs(best_score) >= MATE_SCORE or (deadline is not None and time.time() >= deadline):
+                break
+            if (stop_event is not None and stop_event.is_set()) or (node_limit is not None and nodes >= node_limit):
+                break
+
+        self.last_search_info = self._info(completed_depth, best_score, nodes, start)
+        return best_score, best_move
+
+    @staticmethod
+    def _root_budget(depth: int, deadline: Optional[float], node_limit: Optional[int],
+                     shares: int) -> Tuple[Optional[float], Optional[int], int, bool]:
+        """(échéance, nœuds, parts, interruptible) des tâches d'une profondeur.
+
+        La profondeur 1 est toujours terminée pour avoir un coup à jouer ;
+        au-delà, les nœuds restants sont partagés entre les ``shares`` tâches
+        qui tournent en même temps (compteur commun aux processus).
+        """
+        if depth == 1:
+            return None, None, 1, False
+        return deadline, node_limit, max(shares, 1), True
+
+    def _search_lazy(self, board: ChessBoard, max_depth: int, time_limit: Optional[float],
+                     deadline: Optional[float], stop_event, start: float, node_limit: Optional[int] = None):
+        # Génération de la table avancée ici seulement : tous les processus lisent la même
+        self.shared_table.advance_generation()
+        # Budget de nœuds partagé entre le processus principal et les auxiliaires
+        share = node_limit // self.workers if node_limit is not None else None
+        helpers = [self.pool.submit(_lazy_helper, self._game_id, board, max_depth + (index % 2), deadline, share)
+                   for index in range(self.workers - 1)]
+        try:
+            score, move = self.ai.iterative_deepening(board, max_depth, time_limit, share, stop_event)
+        finally:
+            # Les auxiliaires s'arrêtent dès que le processus principal a fini
+            self._stop.set()
+            helper_nodes = sum(helper.result() for helper in helpers)
+        info = dict(self.ai.last_search_info)
+        info["nodes"] = info.get("nodes", 0) + helper_nodes
+        info["time"] = time.time() - start
+        self.last_search_info = info
+        return score, move
+
+    def _info(self, depth: int, score: Optional[float], nodes: int, start: float) -> dict:
+        return {"depth": depth, "score": score, "nodes": nodes, "time": time.time() - start}
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Perft : compte les positions atteignables à une profondeur donnée.
+
+Sert à mesurer le débit du générateur de coups (nœuds/s) et à vérifier sa
+justesse contre des nombres de nœuds connus.
+
+    python perft.py --depth 4            # position initiale, profondeurs 1 à 4
+    python perft.py --depth 3 --divide   # détail par coup à la racine
+    python perft.py --suite              # suite de non-régression
+"""
+
+import argparse
+import sys
+import time
+from typing import Dict, List, Tuple
+
+from chess_engine import (ChessBoard, Move, START_FEN, move_from, move_to, move_promotion,
+                          square_name)
+
+# Nombres de nœuds de référence (chessprogramming.org, "Perft Results") :
+# roques, prises en passant (clouages horizontaux compris) et promotions.
+PERFT_SUITE: List[Tuple[str, str, Dict[int, int]]] = [
+    ("initiale", START_FEN, {1: 20, 2: 400, 3: 8902, 4: 197281}),
+    ("kiwipete", "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+     {1: 48, 2: 2039, 3: 97862}),
+    ("position 3", "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1", {1: 14, 2: 191, 3: 2812, 4: 43238, 5: 674624}),
+    ("position 4", "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+     {1: 6, 2: 264, 3: 9467, 4: 422333}),
+    ("position 4 inversée", "r2q1rk1/pP1p2pp/Q4n2/bbp1p3/Np6/1B3NBn/pPPP1PPP/R3K2R b KQ - 0 1",
+     {1: 6, 2: 264, 3: 9467}),
+    ("position 5", "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8", {1: 44, 2: 1486, 3: 62379}),
+    ("position 6", "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+     {1: 46, 2: 2079, 3: 89890}),
+    ("promotions", "n1n5/PPPk4/8/8/8/8/4Kppp/5N1N b - - 0 1", {1: 24, 2: 496, 3: 9483, 4: 182838}),
+]
+
+def move_name(move: Move) -> str:
+    """Notation coordonnée d'un coup, par exemple e2e4 ou e7e8q"""
+    promotion = move_promotion(move)
+    suffix = "pnbrqk"[promotion] if promotion else ""
+    return square_name(move_from(move)) + square_name(move_to(move)) + suffix
+
+def perft(board: ChessBoard, depth: int) -> int:
+    """Nombre de positions légales atteintes après depth demi-coups"""
+    moves = board.get_all_valid_moves(board.current_player)
+    if depth <= 1:
+        return len(moves) if depth == 1 else 1
+    nodes = 0
+    for move in moves:
+        board.push(move)
+        nodes += perft(board, depth - 1)
+        board.pop()
+    return nodes
+
+def divide(board: ChessBoard, depth: int) -> Dict[str, int]:
+    """Nombre de nœuds sous chaque coup de la racine"""
+    counts = {}
+    for move in board.get_all_valid_moves(board.current_player):
+        board.push(move)
+        counts[move_name(move)] = perft(board, depth - 1)
+        board.pop()
+    return counts
+
+def run_perft(fen: str, depth: int, show_divide: bool = False):
+    board = ChessBoard.from_fen(fen)
+    print(f"FEN: {fen}")
+    print(f"{'prof.':>5} {'nœuds':>12} {'temps (s)':>10} {'nœuds/s':>12}")
+    for current in range(1, depth + 1):
+        start = time.perf_counter()
+        nodes = perft(board, current)
+        elapsed = time.perf_counter() - start
+        rate = nodes / elapsed if elapsed > 0 else 0
+        print(f"{current:>5} {nodes:>12} {elapsed:>10.3f} {rate:>12.0f}")
+    if show_divide:
+        counts = divide(board, depth)
+        for name in sorted(counts):
+            print(f"{name}: {counts[name]}")
+        print(f"Total: {sum(counts.values())}")
+
+def run_suite(max_depth: int) -> bool:
+    """Vérifie les nombres de nœuds de référence, retourne False en cas d'écart"""
+    ok = True
+    for name, fen, expected in PERFT_SUITE:
+        board = ChessBoard.from_fen(fen)
+        for depth, count in sorted(expected.items()):
+            if depth > max_depth:
+                continue
+            start = time.perf_counter()
+            nodes = perft(board, depth)
+            elapsed = time.perf_counter() - start
+            status = "OK" if nodes == count else "ÉCHEC"
+            ok = ok and nodes == count
+            print(f"{status:5} {name} profondeur {depth}: {nodes} (attendu {count}) en {elapsed:.2f} s")
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description="Perft du générateur de coups")
+    parser.add_argument("--fen", default=START_FEN, help="position de départ (FEN)")
+    parser.add_argument("--depth", type=int, help="profondeur maximale (3 par défaut, toute la suite avec --suite)")
+    parser.add_argument("--divide", action="store_true", help="détail par coup à la racine")
+    parser.add_argument("--suite", action="store_true", help="suite de non-régression")
+    args = parser.parse_args()
+
+    if args.suite:
+        sys.exit(0 if run_suite(args.depth or max(max(expected) for _, _, expected in PERFT_SUITE)) else 1)
+    run_perft(args.fen, args.depth or 3, args.divide)
+
+if __name__ == "__main__":
+    main()
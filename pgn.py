@@ -0,0 +1,212 @@
+"""
+Lecture et écriture de parties au format PGN.
+
+La lecture est un générateur : les parties d'un fichier sont produites une
+à une, sans charger le fichier entier en mémoire. L'écriture rejoue
+``move_history`` depuis la position de départ du plateau.
+
+    with open("parties.pgn", encoding="utf-8") as stream:
+        for game in read_games(stream):
+            board = game.board()
+
+Un coup illégal ou non reconnu arrête la partie sur une ValueError au coup
+concerné.
+"""
+
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from chess_engine import (ChessBoard, Color, Move, START_FEN, MOVE_CAPTURE, NULL_MOVE, WHITE_IDX,
+                          PAWN_IDX, QUEEN_IDX, KING_IDX, move_from, move_to, move_promotion, square_name)
+
+SAN_PIECES = "PNBRQK"
+RESULTS = ("1-0", "0-1", "1/2-1/2", "*")
+# Ordre des sept en-têtes obligatoires
+SEVEN_TAG_ROSTER = ("Event", "Site", "Date", "Round", "White", "Black", "Result")
+LINE_LENGTH = 80
+
+_TAG_RE = re.compile(r'^\[\s*(\w+)\s+"((?:[^"\\]|\\.)*)"\s*\]\s*$')
+_TOKEN_RE = re.compile(r'\{[^}]*\}?|;[^\n]*|\$\d+|[()]|\d+\.+|1-0|0-1|1/2-1/2|\*|[^\s(){};$]+')
+_SAN_RE = re.compile(r'^([NBRQK])?([a-h])?([1-8])?x?([a-h][1-8])(?:=?([NBRQ]))?$')
+# Roques : déplacement du roi (petit roque vers la colonne h)
+CASTLING_SAN = {"O-O": 2, "O-O-O": -2, "0-0": 2, "0-0-0": -2}
+
+def move_to_san(board: ChessBoard, move: Move) -> str:
+    """Notation algébrique (SAN) d'un coup légal dans la position du plateau"""
+    from_sq, to_sq = move_from(move), move_to(move)
+    piece_type = board.mailbox[from_sq][1]
+    capture = "x" if move & MOVE_CAPTURE else ""
+    if piece_type == KING_IDX and to_sq - from_sq in (2, -2):
+        san = "O-O" if to_sq > from_sq else "O-O-O"
+    elif piece_type == PAWN_IDX:
+        san = (square_name(from_sq)[0] + capture if capture else "") + square_name(to_sq)
+        promotion = move_promotion(move)
+        if promotion:
+            san += "=" + SAN_PIECES[promotion]
+    else:
+        # Lever l'ambiguïté entre pièces de même type visant la même case
+        others = [move_from(other) for other in board.get_all_valid_moves(board.current_player)
+                  if move_to(other) == to_sq and move_from(other) != from_sq
+                  and board.mailbox[move_from(other)][1] == piece_type]
+        prefix = ""
+        if others:
+            if all(other % 8 != from_sq % 8 for other in others):
+                prefix = square_name(from_sq)[0]
+            elif all(other // 8 != from_sq // 8 for other in others):
+                prefix = square_name(from_sq)[1]
+            else:
+                prefix = square_name(from_sq)
+        san = SAN_PIECES[piece_type] + prefix + capture + square_name(to_sq)
+
+    board.push(move)
+    if board._is_king_in_check(board.current_player):
+        san += "#" if board._is_checkmate(board.current_player) else "+"
+    board.pop()
+    return san
+
+def parse_san(board: ChessBoard, san: str) -> Move:
+    """Coup légal désigné par une notation SAN ; ValueError s'il n'existe pas"""
+    text = san.rstrip("+#!?")
+    if text in CASTLING_SAN:
+        for move in board.get_all_valid_moves(board.current_player):
+            from_sq = move_from(move)
+            if board.mailbox[from_sq][1] == KING_IDX and move_to(move) - from_sq == CASTLING_SAN[text]:
+                return move
+        raise ValueError(f"Coup illégal : {san}")
+    match = _SAN_RE.match(text)
+    if match is None:
+        raise ValueError(f"Coup non reconnu : {san}")
+    piece, from_file, from_rank, target, promotion = match.groups()
+    piece_type = SAN_PIECES.index(piece) if piece else PAWN_IDX
+    to_sq = (8 - int(target[1])) * 8 + "abcdefgh".index(target[0])
+    promotion_type = SAN_PIECES.index(promotion) if promotion else 0
+
+    candidates = []
+    for move in board.get_all_valid_moves(board.current_player):
+        from_sq = move_from(move)
+        if move_to(move) != to_sq or board.mailbox[from_sq][1] != piece_type:
+            continue
+        name = square_name(from_sq)
+        if (from_file and name[0] != from_file) or (from_rank and name[1] != from_rank):
+            continue
+        # Promotion sans pièce indiquée : dame, comme le font la plupart des logiciels
+        if move_promotion(move) != ((promotion_type or QUEEN_IDX) if move_promotion(move) else promotion_type):
+            continue
+        candidates.append(move)
+    if len(candidates) != 1:
+        raise ValueError(f"Coup {'ambigu' if candidates else 'illégal'} : {san}")
+    return candidates[0]
+
+class PgnGame:
+    """Partie lue dans un fichier PGN : en-têtes et coups en notation SAN"""
+
+    def __init__(self, headers: Dict[str, str], moves: List[str], result: str = "*"):
+        self.headers = headers
+        self.moves = moves
+        self.result = result
+
+    def start_board(self) -> ChessBoard:
+        return ChessBoard(self.headers.get("FEN"))
+
+    def replay(self) -> Iterator[Tuple[ChessBoard, Move]]:
+        """Produit (plateau, coup) avant chaque coup ; le plateau est modifié sur place"""
+        board = self.start_board()
+        for san in self.moves:
+            move = parse_san(board, san)
+            yield board, move
+            board.play(move)
+
+    def board(self) -> ChessBoard:
+        """Plateau après le dernier coup de la partie"""
+        board = self.start_board()
+        for san in self.moves:
+            board.play(parse_san(board, san))
+        return board
+
+def _parse_movetext(text: str) -> Tuple[List[str], str]:
+    moves, result, depth = [], "*", 0
+    for token in _TOKEN_RE.findall(text):
+        if token == "(":
+            depth += 1
+        elif token == ")":
+            depth = max(0, depth - 1)
+        elif depth or token[0] in "{;$" or token[0].isdigit() and token.endswith("."):
+            continue
+        elif token in RESULTS:
+            result = token
+        else:
+            moves.append(token)
+    return moves, result
+
+def read_games(lines: Iterable[str]) -> Iterator[PgnGame]:
+    """Parties d'un flux PGN (fichier ouvert ou itérable de lignes), une à la fois"""
+    headers: Dict[str, str] = {}
+    movetext: List[str] = []
+    for line in lines:
+        line = line.strip()
+        if line.startswith("["):
+            if movetext:
+                yield PgnGame(headers, *_parse_movetext("\n".join(movetext)))
+                headers, movetext = {}, []
+            match = _TAG_RE.match(line)
+            if match:
+                headers[match.group(1)] = re.sub(r"\\(.)", r"\1", match.group(2))
+        elif line and not line.startswith("%"):
+            movetext.append(line)
+    if headers or movetext:
+        yield PgnGame(headers, *_parse_movetext("\n".join(movetext)))
+
+def game_result(board: ChessBoard) -> str:
+    if not board.game_over:
+        return "*"
+    if board.winner is None:
+        return "1/2-1/2"
+    return "1-0" if board.winner == Color.WHITE else "0-1"
+
+def game_to_pgn(board: ChessBoard, headers: Optional[Dict[str, str]] = None) -> str:
+    """Partie du plateau (depuis sa position de départ) au format PGN"""
+    result = game_result(board)
+    tags = {"Event": "?", "Site": "?", "Date": "????.??.??", "Round": "?",
+            "White": "?", "Black": "?", "Result": result}
+    tags.update(headers or {})
+    if board.start_fen != START_FEN:
+        tags["SetUp"] = "1"
+        tags["FEN"] = board.start_fen
+    names = list(SEVEN_TAG_ROSTER) + [name for name in tags if name not in SEVEN_TAG_ROSTER]
+    lines = [f'[{name} "{_escape(str(tags[name]))}"]' for name in names]
+    lines.append("")
+
+    # Rejouer la partie depuis le départ pour écrire chaque coup en SAN
+    replay = ChessBoard(board.start_fen)
+    tokens = []
+    for entry in board.move_history:
+        move = entry[0]
+        if move == NULL_MOVE:
+            continue
+        # Le numéro reste sur la même ligne que son coup
+        san = move_to_san(replay, move)
+        if replay.side == WHITE_IDX:
+            san = f"{replay.fullmove_number()}. {san}"
+        elif not tokens:
+            san = f"{replay.fullmove_number()}... {san}"
+        tokens.append(san)
+        replay.push(move)
+    tokens.append(tags["Result"])
+
+    line = ""
+    for token in tokens:
+        if line and len(line) + 1 + len(token) > LINE_LENGTH:
+            lines.append(line)
+            line = token
+        else:
+            line = f"{line} {token}" if line else token
+    lines.append(line)
+    return "\n".join(lines) + "\n"
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+def write_game(stream: TextIO, board: ChessBoard, headers: Optional[Dict[str, str]] = None):
+    """Ajoute la partie au flux, suivie d'une ligne vide"""
+    stream.write(game_to_pgn(board, headers))
+    stream.write("\n")
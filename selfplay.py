@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Parties IA contre IA, sans interface.
+
+Deux configurations de ``ChessAI`` (A et B : niveau, budget, options de
+recherche) jouent une série de parties sur plusieurs processus. Chaque
+ouverture (quelques demi-coups aléatoires, ou tirée d'une bibliothèque avec
+--book) est jouée deux fois, couleurs inversées. Résultat, motif de fin,
+temps et nœuds par coup sont écrits en JSONL, et un bilan (score de A,
+écart Elo estimé, latence) est affiché.
+
+    python selfplay.py --games 40 --workers 4 --a-depth 3 --b-depth 3 --b-without lmr
+    python selfplay.py --games 20 --a-time 0.2 --b-time 0.1 --output parties.jsonl --pgn parties.pgn
+
+Fins de partie : celles du moteur (mat, pat, règle des cinquante coups,
+triple répétition, matériel insuffisant), et nulle arbitrée à --max-moves
+coups.
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+from chess_ai import ChessAI, MAX_SEARCH_DEPTH
+from chess_engine import ChessBoard, Color, WHITE_IDX, BLACK_IDX, START_FEN
+from benchmark import SEARCH_OPTIONS
+from book import OpeningBook
+from tablebase import Tablebases
+from perft import move_name
+from pgn import game_to_pgn
+
+def engine_config(depth: int, time_limit: Optional[float], without: List[str]) -> Dict:
+    """Configuration d'un moteur, transmissible aux processus de calcul"""
+    return {"depth": depth, "time_limit": time_limit,
+            "options": {f"use_{name}": name not in without for name in SEARCH_OPTIONS}}
+
+def end_reason(board: ChessBoard, max_plies: int) -> Optional[str]:
+    """Motif de fin de la partie, ou None si elle continue"""
+    if board.game_over:
+        return board.end_reason
+    if len(board.move_history) >= max_plies:
+        return "limite de coups"
+    return None
+
+def play_game(index: int, white: Dict, black: Dict, opening_seed: int, random_plies: int,
+              max_plies: int, hash_size_mb: float = 16, start_fen: str = START_FEN,
+              names: Tuple[str, str] = ("A", "B"), book_path: Optional[str] = None,
+              tablebase_dir: Optional[str] = None) -> Dict:
+    """Joue une partie complète et retourne son compte rendu (partie PGN sous la clé "pgn")"""
+    board = ChessBoard(start_fen)
+    if book_path is not None:
+        # Ouverture tirée de la bibliothèque, jusqu'à en sortir
+        with OpeningBook(book_path, random_choice=True, seed=opening_seed) as book:
+            move = book.choose(board)
+            while move is not None and not board.game_over:
+                board.play(move)
+                move = book.choose(board)
+    else:
+        rng = random.Random(opening_seed)
+        for _ in range(random_plies):
+            moves = board.get_all_valid_moves(board.current_player)
+            if not moves or board.game_over:
+                break
+            board.play(rng.choice(moves))
+    opening = [move_name(entry[0]) for entry in board.move_history]
+
+    configs = (white, black)
+    tablebase = Tablebases(tablebase_dir) if tablebase_dir is not None else None
+    engines = [ChessAI(config["depth"], hash_size_mb, tablebase=tablebase, **config["options"])
+               for config in configs]
+    times: List[List[float]] = [[], []]
+    nodes: List[List[int]] = [[], []]
+    try:
+        while True:
+            reason = end_reason(board, max_plies)
+            if reason is not None:
+                break
+            side = board.side
+            config = configs[side]
+            # Sans budget, la recherche va jusqu'au niveau ; avec, aussi loin que le temps le permet
+            depth = config["depth"] if config["time_limit"] is None else MAX_SEARCH_DEPTH
+            start = time.perf_counter()
+            _, move = engines[side].iterative_deepening(board, depth, config["time_limit"])
+            times[side].append(time.perf_counter() - start)
+            nodes[side].append(engines[side].last_search_info.get("nodes", 0))
+            board.play(move)
+    finally:
+        if tablebase is not None:
+            tablebase.close()
+
+    if reason == "mat":
+        result = "1-0" if board.winner == Color.WHITE else "0-1"
+    else:
+        result = "1/2-1/2"
+    headers = {"Event": "selfplay", "Round": str(index + 1), "White": names[0], "Black": names[1],
+               "Result": result, "Termination": reason}
+    return {
+        "game": index,
+        "white": names[0],
+        "black": names[1],
+        "result": result,
+        "reason": reason,
+        "plies": len(board.move_history),
+        "opening": opening,
+        "moves": [move_name(entry[0]) for entry in board.move_history],
+        "start_fen": board.start_fen,
+        "times": [[round(t, 4) for t in side_times] for side_times in times],
+        "nodes": nodes,
+        "pgn": game_to_pgn(board, headers),
+    }
+
+def elo_difference(score: float) -> Optional[float]:
+    """Écart Elo correspondant à une proportion de points (None à 0 ou 100 %)"""
+    if not 0 < score < 1:
+        return None
+    return -400 * math.log10(1 / score - 1)
+
+class MatchStats:
+    """Bilan de A contre B, mis à jour partie par partie"""
+
+    def __init__(self):
+        self.wins = self.draws = self.losses = 0
+        self.reasons: Dict[str, int] = {}
+        self.times = {"A": [], "B": []}
+        self.nodes = {"A": [], "B": []}
+
+    def add(self, record: Dict):
+        a_side = WHITE_IDX if record["white"] == "A" else BLACK_IDX
+        if record["result"] == "1/2-1/2":
+            self.draws += 1
+        elif (record["result"] == "1-0") == (a_side == WHITE_IDX):
+            self.wins += 1
+        else:
+            self.losses += 1
+        self.reasons[record["reason"]] = self.reasons.get(record["reason"], 0) + 1
+        for side, name in ((a_side, "A"), (a_side ^ 1, "B")):
+            self.times[name] += record["times"][side]
+            self.nodes[name] += record["nodes"][side]
+
+    def summary(self) -> str:
+        games = self.wins + self.draws + self.losses
+        score = (self.wins + self.draws / 2) / games if games else 0
+        elo = elo_difference(score)
+        lines = [f"A : +{self.wins} ={self.draws} -{self.losses} sur {games} parties, "
+                 f"score {score:.1%}, écart Elo {'%+.0f' % elo if elo is not None else 'indéterminé'}",
+                 "Fins : " + ", ".join(f"{reason} {count}" for reason, count in sorted(self.reasons.items()))]
+        for name in ("A", "B"):
+            times, nodes = self.times[name], self.nodes[name]
+            if times:
+                lines.append(f"{name} : {sum(times) / len(times) * 1000:.0f} ms/coup (max "
+                             f"{max(times) * 1000:.0f} ms), {sum(nodes) / len(nodes):.0f} nœuds/coup")
+        return "\n".join(lines)
+
+def run_match(games: int, engine_a: Dict, engine_b: Dict, workers: int, random_plies: int = 4,
+              max_plies: int = 400, seed: int = 0, hash_size_mb: float = 16,
+              start_fen: str = START_FEN, output: Optional[str] = None,
+              pgn_output: Optional[str] = None, book_path: Optional[str] = None,
+              tablebase_dir: Optional[str] = None) -> MatchStats:
+    stats = MatchStats()
+    out = open(output, "w", encoding="utf-8") if output else None
+    pgn_out = open(pgn_output, "w", encoding="utf-8") if pgn_output else None
+    try:
+        with ProcessPoolExecutor(workers) as pool:
+            futures = []
+            for index in range(games):
+                # Même ouverture pour les deux parties d'une paire, couleurs inversées
+                if index % 2 == 0:
+                    white, black, names = engine_a, engine_b, ("A", "B")
+                else:
+                    white, black, names = engine_b, engine_a, ("B", "A")
+                futures.append(pool.submit(play_game, index, white, black, seed + index // 2,
+                                           random_plies, max_plies, hash_size_mb, start_fen, names,
+                                           book_path, tablebase_dir))
+            for future in as_completed(futures):
+                record = future.result()
+                pgn_text = record.pop("pgn")
+                stats.add(record)
+                print(f"partie {record['game']:>3} : {record['white']} (blancs) - {record['black']} "
+                      f"{record['result']:7} {record['reason']}, {record['plies']} demi-coups")
+                if out is not None:
+                    out.write(json.dumps(record) + "\n")
+                    out.flush()
+                if pgn_out is not None:
+                    pgn_out.write(pgn_text + "\n")
+    finally:
+        for stream in (out, pgn_out):
+            if stream is not None:
+                stream.close()
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description="Parties IA contre IA")
+    parser.add_argument("--games", type=int, default=10, help="nombre de parties (paires d'ouvertures)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="parties simultanées")
+    for name in ("a", "b"):
+        parser.add_argument(f"--{name}-depth", type=int, default=3, help=f"niveau du moteur {name.upper()}")
+        parser.add_argument(f"--{name}-time", type=float, help=f"budget par coup du moteur {name.upper()} (s)")
+        parser.add_argument(f"--{name}-without", action="append", default=[], choices=SEARCH_OPTIONS,
+                            help=f"option de recherche désactivée pour {name.upper()} (répétable)")
+    parser.add_argument("--random-plies", type=int, default=4, help="demi-coups aléatoires d'ouverture")
+    parser.add_argument("--book", help="ouvertures tirées d'une bibliothèque (book.py) au lieu du hasard")
+    parser.add_argument("--tablebases", help="répertoire des tables de finales (tablebase.py), pour les deux moteurs")
+    parser.add_argument("--max-moves", type=int, default=200, help="nulle arbitrée après N coups")
+    parser.add_argument("--seed", type=int, default=0, help="graine des ouvertures")
+    parser.add_argument("--fen", default=START_FEN, help="position de départ")
+    parser.add_argument("--hash", type=float, default=16, help="table de transposition par moteur (Mo)")
+    parser.add_argument("--output", help="comptes rendus des parties (JSONL)")
+    parser.add_argument("--pgn", help="parties au format PGN")
+    args = parser.parse_args()
+
+    engine_a = engine_config(args.a_depth, args.a_time, args.a_without)
+    engine_b = engine_config(args.b_depth, args.b_time, args.b_without)
+    stats = run_match(args.games, engine_a, engine_b, args.workers, args.random_plies,
+                      args.max_moves * 2, args.seed, args.hash, args.fen, args.output, args.pgn,
+                      args.book, args.tablebases)
+    print(stats.summary())
+
+if __name__ == "__main__":
+    main()
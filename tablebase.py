@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Tables de finales à trois pièces (KQK, KRK, KPK), par analyse rétrograde.
+
+Chaque table donne, pour toute position roi et pièce contre roi, le résultat
+exact et la distance au mat en demi-coups. Elle est indexée du point de vue
+du camp fort, ramené aux blancs (les positions où il a les noirs sont
+retournées verticalement) :
+
+    index = ((trait << 6 | roi fort) << 6 | roi faible) << 6 | pièce
+
+avec trait = 0 si le camp fort joue. Un octet par position : 0 pour nulle
+(ou position impossible), 1 + d pour perdue en d demi-coups (d pair),
+128 + d pour gagnée en d demi-coups (d impair). Les fichiers (en-tête de
+8 octets puis 2 * 64 ** 3 octets) sont projetés en mémoire à la lecture.
+
+    python tablebase.py --output-dir tablebases        # KQK, KRK puis KPK
+
+La génération passe par le générateur de coups de ``ChessBoard`` ; KPK
+s'appuie sur KQK et KRK pour les promotions.
+"""
+
+import argparse
+import mmap
+import os
+import sys
+import time
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from chess_engine import (ChessBoard, Move, COLORS, WHITE_IDX, BLACK_IDX, PAWN_IDX, KNIGHT_IDX,
+                          BISHOP_IDX, ROOK_IDX, QUEEN_IDX, KING_IDX, castling_rights, move_from, move_to,
+                          move_promotion)
+from bitboard import popcount
+
+TABLEBASE_MAGIC = b"EEMTB\x00\x00\x01"
+TABLE_SIZE = 2 * 64 * 64 * 64
+# Tables dans l'ordre de génération : KPK dépend des deux autres
+TABLES = {"KQK": QUEEN_IDX, "KRK": ROOK_IDX, "KPK": PAWN_IDX}
+TABLE_NAMES = {piece_type: name for name, piece_type in TABLES.items()}
+DEFAULT_DIRECTORY = "tablebases"
+
+# Résultats, du point de vue du camp au trait
+WIN, DRAW, LOSS = 1, 0, -1
+
+def _index(strong_to_move: int, strong_king: int, weak_king: int, piece: int) -> int:
+    return ((strong_to_move << 6 | strong_king) << 6 | weak_king) << 6 | piece
+
+def _decode(value: int) -> Tuple[int, int]:
+    """(résultat, demi-coups jusqu'au mat) d'un octet de table"""
+    if value == 0:
+        return DRAW, 0
+    if value < 128:
+        return LOSS, value - 1
+    return WIN, value - 128
+
+def generate_table(piece_type: int, tables: Dict[int, bytes]) -> bytearray:
+    """Analyse rétrograde de roi et pièce (blancs) contre roi (noirs).
+
+    ``tables`` contient les tables déjà générées, consultées après une
+    promotion. Les positions mates sont perdues en 0 ; chaque position
+    gagnée ou perdue à la distance d résout ses prédécesseurs à d + 1.
+    """
+    values = bytearray(TABLE_SIZE)
+    remaining = array("B", bytes(TABLE_SIZE))  # Coups pas encore réfutés
+    successors, predecessors = array("I"), array("I")
+    levels: Dict[int, List[int]] = {0: []}
+    # Coups vers une autre table (promotion) : résolus à la distance de leur résultat
+    external: Dict[int, List[int]] = {}
+
+    board = ChessBoard()
+    for index in range(TABLE_SIZE):
+        piece = index & 63
+        weak_king = (index >> 6) & 63
+        strong_king = (index >> 12) & 63
+        strong_to_move = index >> 18
+        if strong_king == weak_king or piece in (strong_king, weak_king):
+            continue
+        if piece_type == PAWN_IDX and (piece < 8 or piece >= 56):
+            continue
+        board.side = BLACK_IDX if strong_to_move else WHITE_IDX
+        board._clear()
+        board._put_piece(strong_king, WHITE_IDX, KING_IDX)
+        board._put_piece(weak_king, BLACK_IDX, KING_IDX)
+        board._put_piece(piece, WHITE_IDX, piece_type)
+        # Le camp qui vient de jouer ne peut pas être en échec
+        waiting_king = weak_king if strong_to_move == 0 else strong_king
+        if board._attackers(waiting_king, board.side, board.occupied):
+            continue
+
+        moves = board.get_all_valid_moves(COLORS[board.side])
+        if not moves:
+            if board._is_king_in_check(COLORS[board.side]):
+                values[index] = 1  # Mat : perdue en 0
+                levels[0].append(index)
+            continue  # Pat : nulle
+        remaining[index] = len(moves)
+        for move in moves:
+            from_sq, to_sq = move_from(move), move_to(move)
+            if strong_to_move == 0:
+                if from_sq == strong_king:
+                    successor = _index(1, to_sq, weak_king, piece)
+                elif move_promotion(move):
+                    table = tables.get(move_promotion(move))
+                    if table is not None:
+                        result, distance = _decode(table[_index(1, strong_king, weak_king, to_sq)])
+                        if result != DRAW:
+                            external.setdefault(distance, []).append(index)
+                    continue  # Fou ou cavalier : nulle
+                else:
+                    successor = _index(1, strong_king, weak_king, to_sq)
+            elif to_sq == piece:
+                continue  # Pièce prise : roi contre roi, nulle
+            else:
+                successor = _index(0, strong_king, to_sq, piece)
+            successors.append(successor)
+            predecessors.append(index)
+
+    # Prédécesseurs de chaque position, rangés par position (tri par comptage)
+    starts = array("I", bytes(4 * (TABLE_SIZE + 1)))
+    for successor in successors:
+        starts[successor + 1] += 1
+    for index in range(TABLE_SIZE):
+        starts[index + 1] += starts[index]
+    position = array("I", starts)
+    parents = array("I", bytes(4 * len(successors)))
+    for successor, predecessor in zip(successors, predecessors):
+        parents[position[successor]] = predecessor
+        position[successor] += 1
+    del successors, predecessors, position
+
+    # Distances paires : positions perdues ; impaires : positions gagnées
+    distance = 0
+    while levels.get(distance) or any(depth >= distance for depth in external):
+        following = levels.setdefault(distance + 1, [])
+        candidates = [parent for node in levels[distance] for parent in parents[starts[node]:starts[node + 1]]]
+        candidates += external.pop(distance, [])
+        for parent in candidates:
+            if values[parent]:
+                continue
+            if distance % 2 == 0:
+                # Un coup mène à une position perdue pour l'adversaire
+                values[parent] = 128 + distance + 1
+                following.append(parent)
+            else:
+                remaining[parent] -= 1
+                if remaining[parent] == 0:
+                    # Tous les coups mènent à une position gagnée pour l'adversaire
+                    values[parent] = 1 + distance + 1
+                    following.append(parent)
+        distance += 1
+    return values
+
+def table_path(directory: str, name: str) -> str:
+    return os.path.join(directory, f"{name}.tb")
+
+def generate(directory: str = DEFAULT_DIRECTORY, names: Optional[List[str]] = None):
+    """Génère les tables demandées (toutes par défaut) et leurs dépendances"""
+    os.makedirs(directory, exist_ok=True)
+    wanted = set(names or TABLES)
+    if "KPK" in wanted:
+        wanted |= {"KQK", "KRK"}
+    tables: Dict[int, bytes] = {}
+    for name, piece_type in TABLES.items():
+        if name not in wanted:
+            continue
+        start = time.time()
+        values = generate_table(piece_type, tables)
+        tables[piece_type] = values
+        with open(table_path(directory, name), "wb") as stream:
+            stream.write(TABLEBASE_MAGIC)
+            stream.write(values)
+        longest = max(_decode(value)[1] for value in values)
+        print(f"{name} : {sum(1 for value in values if value >= 128)} positions gagnantes, "
+              f"mat le plus long en {longest} demi-coups, {time.time() - start:.0f} s", file=sys.stderr)
+
+class Tablebases:
+    """Tables de finales disponibles dans un répertoire, projetées en mémoire"""
+
+    def __init__(self, directory: str = DEFAULT_DIRECTORY):
+        self.directory = directory  # Rouvert par chemin dans les processus de calcul
+        self._maps: Dict[int, mmap.mmap] = {}
+        for name, piece_type in TABLES.items():
+            path = table_path(directory, name)
+            if not os.path.exists(path):
+                continue
+            with open(path, "rb") as stream:
+                table = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+            if table[:len(TABLEBASE_MAGIC)] != TABLEBASE_MAGIC or len(table) != len(TABLEBASE_MAGIC) + TABLE_SIZE:
+                table.close()
+                raise ValueError(f"Table de finale invalide : {path}")
+            self._maps[piece_type] = table
+        self.names = sorted(TABLE_NAMES[piece_type] for piece_type in self._maps)
+
+    def probe(self, board: ChessBoard) -> Optional[Tuple[int, int]]:
+        """(résultat pour le camp au trait, demi-coups jusqu'au mat), ou None hors des tables"""
+        count = popcount(board.occupied)
+        if count != 3:
+            return (DRAW, 0) if count == 2 else None  # Deux rois seuls : nulle
+        if castling_rights(board.unmoved):
+            return None  # Positions avec droit de roque absentes des tables
+        for strong in (WHITE_IDX, BLACK_IDX):
+            pieces = board.pieces[strong]
+            others = board.occupancy[strong] & ~pieces[KING_IDX]
+            if not others:
+                continue
+            sq = others.bit_length() - 1
+            piece_type = board.mailbox[sq][1]
+            if piece_type in (KNIGHT_IDX, BISHOP_IDX):
+                return DRAW, 0  # Matériel insuffisant
+            table = self._maps.get(piece_type)
+            if table is None:
+                return None
+            # Camp fort ramené aux blancs
+            flip = 56 if strong == BLACK_IDX else 0
+            strong_king = (pieces[KING_IDX].bit_length() - 1) ^ flip
+            weak_king = (board.pieces[strong ^ 1][KING_IDX].bit_length() - 1) ^ flip
+            index = _index(0 if board.side == strong else 1, strong_king, weak_king, sq ^ flip)
+            return _decode(table[len(TABLEBASE_MAGIC) + index])
+        return None
+
+    def best_move(self, board: ChessBoard) -> Optional[Tuple[Move, int, int]]:
+        """Meilleur coup d'après les tables : (coup, résultat, demi-coups jusqu'au mat)"""
+        if self.probe(board) is None:
+            return None
+        best = None
+        for move in board.get_all_valid_moves(board.current_player):
+            board.push(move)
+            child = self.probe(board)
+            board.pop()
+            if child is None:
+                return None
+            result, distance = -child[0], child[1] + 1
+            # Gagner au plus vite, perdre au plus tard
+            rank = (result, -distance if result == WIN else distance)
+            if best is None or rank > best[0]:
+                best = (rank, move, result, distance if result != DRAW else 0)
+        return best[1:] if best is not None else None
+
+    def close(self):
+        for table in self._maps.values():
+            table.close()
+        self._maps = {}
+
+def main():
+    parser = argparse.ArgumentParser(description="Génération des tables de finales")
+    parser.add_argument("tables", nargs="*", help=f"tables à générer parmi {', '.join(TABLES)} (toutes par défaut)")
+    parser.add_argument("--output-dir", default=DEFAULT_DIRECTORY, help="répertoire des tables")
+    args = parser.parse_args()
+    unknown = set(args.tables) - set(TABLES)
+    if unknown:
+        parser.error(f"table inconnue : {', '.join(sorted(unknown))}")
+    generate(args.output_dir, args.tables)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Notation : FEN et PGN relus à l'identique."""
+
+import io
+
+import pytest
+
+from chess_engine import START_FEN, ChessBoard
+from pgn import game_to_pgn, parse_san, read_games
+
+ROUND_TRIP_FENS = [
+    START_FEN,
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "r3k2r/8/8/8/8/8/8/R3K2R b Kq - 12 40",
+    # Prises en passant possibles, pour chaque camp
+    "rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3",
+    "rnbqkbnr/ppp1pppp/8/8/2Pp4/8/PP1PPPPP/RNBQKBNR b KQkq c3 0 3",
+]
+
+# Parties depuis une position : levée d'ambiguïté par la rangée, la colonne
+# ou la case entière, promotions (sous-promotion comprise), roque
+GAMES = [
+    ("5k2/1P6/8/R6R/8/6K1/8/R7 w - - 0 1", "R1a3 Ke7 Rae5+ Kd7 b8=N+ Kd6"),
+    ("4k3/8/8/8/8/Q7/8/Q1Q1K2R w K - 0 1", "Qa1b2 Kd7 O-O"),
+    ("8/P6k/8/8/8/8/6Kp/8 w - - 0 1", "a8=Q h1=R Kxh1"),
+]
+
+@pytest.mark.parametrize("fen", ROUND_TRIP_FENS)
+def test_fen_round_trip(fen):
+    assert ChessBoard(fen).to_fen() == fen
+
+def test_fen_round_trip_after_moves():
+    board = ChessBoard()
+    for san in "e4 d5 e5 f5 Nf3 Nc6 Be2 Bd7 O-O".split():
+        board.play(parse_san(board, san))
+    assert ChessBoard(board.to_fen()).to_fen() == board.to_fen()
+
+def test_fen_drops_unusable_en_passant_square():
+    # Aucun pion noir ne peut prendre en e3 : la case n'est pas retenue
+    board = ChessBoard("rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1")
+    assert board.ep_square is None and board.to_fen().split()[3] == "-"
+
+def test_fen_rejects_side_not_to_move_in_check():
+    with pytest.raises(ValueError):
+        ChessBoard("4k3/8/8/8/8/8/4R3/4K3 w - - 0 1")
+    ChessBoard("4k3/8/8/8/8/8/4R3/4K3 b - - 0 1")
+
+@pytest.mark.parametrize("fen, moves", GAMES)
+def test_pgn_round_trip(fen, moves):
+    board = ChessBoard(fen)
+    for san in moves.split():
+        assert board.play(parse_san(board, san)), san
+    games = list(read_games(io.StringIO(game_to_pgn(board, {"White": "a", "Black": "b"}))))
+    assert len(games) == 1
+    game = games[0]
+    assert game.moves == moves.split()
+    assert game.headers["FEN"] == fen and game.headers["White"] == "a"
+    replayed = game.board()
+    assert [entry[0] for entry in replayed.move_history] == [entry[0] for entry in board.move_history]
+    assert replayed.to_fen() == board.to_fen()
@@ -0,0 +1,61 @@
+"""Recherche parallèle à la racine : mêmes résultats que la recherche séquentielle."""
+
+import threading
+
+from chess_ai import ChessAI
+from chess_engine import ChessBoard
+from parallel import ParallelSearch
+
+POSITIONS = [
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R b KQkq - 0 1",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+    "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+]
+
+def _compare(options, depth):
+    with ParallelSearch(2, depth, 16, "root", options) as parallel:
+        for fen in POSITIONS:
+            serial = ChessAI(depth, **options).iterative_deepening(ChessBoard(fen), depth)
+            parallel.new_game()
+            assert parallel.search(ChessBoard(fen), depth) == serial, (options, fen)
+
+def test_root_split_matches_serial():
+    _compare({}, 2)
+    _compare({}, 3)
+
+def test_root_split_forwards_options():
+    # Les processus de calcul doivent chercher avec les mêmes options que le séquentiel
+    _compare({"use_mobility": False, "use_null_move": False}, 3)
+    _compare({"use_quiescence": False}, 3)
+
+def test_root_split_always_returns_move():
+    stop = threading.Event()
+    stop.set()
+    with ParallelSearch(2, 3) as parallel:
+        for fen in POSITIONS:
+            assert parallel.search(ChessBoard(fen), 5, time_limit=0.0)[1] is not None
+            assert parallel.search(ChessBoard(fen), 5, stop_event=stop)[1] is not None
+
+def test_new_game_resets_workers():
+    # Un seul processus : même nombre de nœuds qu'à froid si sa table a bien été vidée
+    board = ChessBoard(POSITIONS[1])
+    with ParallelSearch(1, 3) as parallel:
+        parallel.search(board, 3)
+        cold = parallel.last_search_info["nodes"]
+        parallel.search(board, 3)
+        assert parallel.last_search_info["nodes"] < cold
+        parallel.new_game()
+        parallel.search(board, 3)
+        assert parallel.last_search_info["nodes"] == cold
+
+def test_node_limit_shared_between_workers():
+    # Le budget vaut pour toute la recherche, pas pour chaque processus ;
+    # chacun peut le dépasser d'au plus un intervalle de vérification (256 nœuds)
+    limit = 5000
+    for mode in ("root", "lazy"):
+        with ParallelSearch(2, 3, mode=mode) as parallel:
+            for fen in POSITIONS:
+                parallel.new_game()
+                assert parallel.search(ChessBoard(fen), 64, node_limit=limit)[1] is not None
+                assert parallel.last_search_info["nodes"] <= limit + 3 * 256, (mode, fen)
@@ -0,0 +1,82 @@
+"""Règles de nulle et de roque du moteur (chess_engine)."""
+
+from chess_engine import ChessBoard, Color, encode_move
+from pgn import parse_san
+
+def _play(board, moves):
+    for san in moves.split():
+        assert board.play(parse_san(board, san)), san
+
+def _castles(fen):
+    """Roques blancs permis : (petit, grand)"""
+    moves = ChessBoard(fen).get_all_valid_moves(Color.WHITE)
+    return encode_move(60, 62) in moves, encode_move(60, 58) in moves
+
+def test_threefold_repetition():
+    board = ChessBoard()
+    _play(board, "Nf3 Nf6 Ng1 Ng8")
+    assert board.repetition_count() == 2 and not board.game_over
+    _play(board, "Nf3 Nf6 Ng1 Ng8")
+    assert board.repetition_count() == 3
+    assert board.game_over and board.end_reason == "répétition" and board.winner is None
+
+def test_repetition_key_includes_en_passant_square():
+    # Après d4, la prise en passant exd3 est possible : la position n'est pas
+    # la même que plus tard avec les mêmes pièces et le même camp au trait
+    board = ChessBoard("4k3/8/8/8/4p3/8/3P4/4K3 w - - 0 1")
+    _play(board, "d4")
+    assert board.ep_square is not None
+    _play(board, "Kf7 Kf2 Ke8 Ke1")
+    assert board.repetition_count() == 1
+    _play(board, "Kf7 Kf2 Ke8 Ke1 Kf7 Kf2 Ke8 Ke1")
+    assert board.repetition_count() == 3 and board.end_reason == "répétition"
+
+def test_fifty_move_rule():
+    board = ChessBoard("4k3/8/8/8/8/8/8/R3K3 w - - 98 80")
+    _play(board, "Ra2")
+    assert board.halfmove == 99 and not board.game_over
+    _play(board, "Kd7")
+    assert board.halfmove == 100
+    assert board.game_over and board.end_reason == "cinquante coups"
+
+def test_fifty_move_rule_reset_by_pawn_move():
+    board = ChessBoard("4k3/8/8/8/8/8/P7/4K3 w - - 99 80")
+    _play(board, "a3")
+    assert board.halfmove == 0 and not board.game_over
+
+def test_mate_takes_precedence_over_fifty_move_rule():
+    board = ChessBoard("k7/8/1K6/8/8/8/8/7R w - - 99 80")
+    _play(board, "Rh8")
+    assert board.end_reason == "mat" and board.winner == Color.WHITE
+
+def test_insufficient_material():
+    for fen in ("4k3/8/8/8/8/8/8/4K3 w - - 0 1",       # K contre K
+                "4k3/8/8/8/8/8/8/2B1K3 w - - 0 1",     # KF contre K
+                "4k3/8/8/8/8/8/8/1N2K3 w - - 0 1",     # KC contre K
+                "2b1k3/8/8/8/8/8/8/3BK3 w - - 0 1"):   # fous de même couleur
+        board = ChessBoard(fen)
+        assert board.insufficient_material(), fen
+        assert board.game_over and board.end_reason == "matériel insuffisant", fen
+
+def test_sufficient_material():
+    for fen in ("2b1k3/8/8/8/8/8/8/2B1K3 w - - 0 1",    # fous de couleurs différentes
+                "4k3/8/8/8/8/8/8/2B1KB2 w - - 0 1",     # deux fous de couleurs différentes
+                "4k3/8/8/8/8/8/8/1NN1K3 w - - 0 1",     # deux cavaliers
+                "4k3/8/8/8/8/8/8/1NB1K3 w - - 0 1",     # fou et cavalier
+                "4k3/8/8/8/8/8/P7/4K3 w - - 0 1"):      # pion
+        assert not ChessBoard(fen).insufficient_material(), fen
+
+def test_castling():
+    assert _castles("4k3/8/8/8/8/8/8/R3K2R w KQ - 0 1") == (True, True)
+    # Sans droit de roque
+    assert _castles("4k3/8/8/8/8/8/8/R3K2R w - - 0 1") == (False, False)
+    # Roi en échec : aucun roque
+    assert _castles("4k3/4r3/8/8/8/8/8/R3K2R w KQ - 0 1") == (False, False)
+    # Case traversée (f1) ou d'arrivée (g1) attaquée
+    assert _castles("4kr2/8/8/8/8/8/8/R3K2R w KQ - 0 1") == (False, True)
+    assert _castles("4k1r1/8/8/8/8/8/8/R3K2R w KQ - 0 1") == (False, True)
+    assert _castles("3rk3/8/8/8/8/8/8/R3K2R w KQ - 0 1") == (True, False)
+    # b1 n'est traversée que par la tour : le grand roque reste permis
+    assert _castles("1r2k3/8/8/8/8/8/8/R3K2R w KQ - 0 1") == (True, True)
+    # Pièce entre le roi et la tour
+    assert _castles("4k3/8/8/8/8/8/8/RN2K1NR w KQ - 0 1") == (False, False)
@@ -0,0 +1,38 @@
+"""Cohérence de la recherche : le score ne doit pas dépendre de la fenêtre."""
+
+import math
+
+from chess_ai import ChessAI
+from chess_engine import ChessBoard
+
+KIWIPETE_BLACK = "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R b KQkq - 0 1"
+
+def test_root_score_independent_of_window():
+    # Les noirs maximisent : toute borne alpha sous le score exact doit le retrouver
+    board = ChessBoard(KIWIPETE_BLACK)
+    for move in board.get_all_valid_moves(board.current_player)[:8]:
+        exact = ChessAI(2).search_move(board, move, 2, -math.inf, math.inf)
+        for alpha in (exact - 300, exact - 70, exact - 1):
+            assert ChessAI(2).search_move(board, move, 2, alpha, math.inf) == exact
+
+def test_delta_pruning_keeps_upper_bound():
+    # h3g2 : les reprises élaguées en fenêtre nulle donnaient une borne fausse
+    board = ChessBoard(KIWIPETE_BLACK)
+    move = board.find_move((5, 7), (6, 6))
+    exact = ChessAI(2).search_move(board, move, 2, -math.inf, math.inf)
+    for alpha in (-60, 0, exact - 1):
+        assert ChessAI(2).search_move(board, move, 2, alpha, math.inf) == exact
+
+TACTICAL_POSITIONS = [
+    ("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1", 3),
+    ("8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1", 4),
+    ("r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1", 3),
+    ("n1n5/PPPk4/8/8/8/8/4Kppp/5N1N b - - 0 1", 4),
+]
+
+def test_pvs_matches_plain_alpha_beta():
+    # La fenêtre nulle ne doit changer ni le score ni le coup à profondeur fixe
+    for fen, depth in TACTICAL_POSITIONS:
+        with_pvs = ChessAI(depth, use_pvs=True).iterative_deepening(ChessBoard(fen), depth)
+        without_pvs = ChessAI(depth, use_pvs=False).iterative_deepening(ChessBoard(fen), depth)
+        assert with_pvs == without_pvs, fen
@@ -0,0 +1,22 @@
+"""Table de transposition : le budget mémoire demandé est respecté."""
+
+import random
+import tracemalloc
+
+from transposition import TranspositionTable
+
+def test_memory_within_budget():
+    rng = random.Random(0)
+    size_mb = 2
+    tracemalloc.start()
+    try:
+        table = TranspositionTable(size_mb)
+        # Chaque case remplie, avec des valeurs réalistes (clé 64 bits, score et coup non partagés)
+        for index in range(table.size):
+            key = rng.getrandbits(64) & ~table.mask | index
+            table.store(key, rng.randint(1, 10), 0, rng.randint(-3000, 3000), rng.getrandbits(17))
+        used = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    assert all(entry is not None for entry in table.entries)
+    assert used <= size_mb * 1024 * 1024
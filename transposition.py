@@ -0,0 +1,179 @@
+"""
+Table de transposition de taille fixe pour la recherche de l'IA.
+"""
+
+import math
+from typing import Optional, Tuple
+
+# Types de borne d'une entrée
+EXACT = 0
+LOWER_BOUND = 1  # Score >= valeur stockée (coupure beta)
+UPPER_BOUND = 2  # Score <= valeur stockée (aucun coup n'a amélioré alpha)
+
+# Coût mémoire d'une entrée, mesuré avec tracemalloc (environ 187 octets sur
+# CPython 3) : emplacement dans la liste, tuple de six éléments, et les
+# entiers clé (64 bits), score et coup qui ne sont pas partagés
+ENTRY_BYTES = 192
+
+class TranspositionTable:
+    """Table indexée par clé de Zobrist, de taille fixée par un budget mémoire.
+
+    Remplacement : une entrée est écrasée si elle vient d'une recherche
+    précédente, si elle concerne la même position, ou si la nouvelle
+    recherche est au moins aussi profonde.
+    """
+
+    def __init__(self, size_mb: float = 16):
+        count = max(1, int(size_mb * 1024 * 1024) // ENTRY_BYTES)
+        # Taille arrondie à la puissance de deux inférieure pour indexer par masque
+        self.size = 1 << (count.bit_length() - 1)
+        self.mask = self.size - 1
+        self.entries = [None] * self.size
+        self.generation = 0
+        self.hits = 0
+        self.probes = 0
+
+    def new_search(self):
+        """À appeler avant chaque recherche pour vieillir les anciennes entrées"""
+        self.generation = (self.generation + 1) & 0xFF
+
+    def clear(self):
+        self.entries = [None] * self.size
+        self.generation = 0
+
+    def probe(self, key: int) -> Optional[Tuple]:
+        """Retourne (clé, profondeur, borne, score, coup, génération) ou None"""
+        self.probes += 1
+        entry = self.entries[key & self.mask]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        return None
+
+    def store(self, key: int, depth: int, bound: int, score: float, move):
+        index = key & self.mask
+        entry = self.entries[index]
+        if (entry is None or entry[0] == key or entry[5] != self.generation
+                or depth >= entry[1]):
+            if move is None and entry is not None and entry[0] == key:
+                # Conserver le meilleur coup connu pour le tri des coups
+                move = entry[4]
+            self.entries[index] = (key, depth, bound, score, move, self.generation)
+
+    def usage(self) -> float:
+        """Proportion d'entrées de la génération courante (échantillon)"""
+        sample = self.entries[:1000]
+        used = sum(1 for entry in sample if entry is not None and entry[5] == self.generation)
+        return used / len(sample)
+
+# Table partagée entre processus : deux entiers 64 bits par entrée, la clé
+# xorée avec les données puis les données empaquetées :
+#   coup (20 bits) | profondeur (8) | borne (2) | génération (8) | score (24)
+# Le coup est l'entier encodé par chess_engine, plus un (0 : pas de coup).
+SHARED_ENTRY_BYTES = 16
+_SCORE_OFFSET = 1 << 23
+_SCORE_INFINITY = (1 << 23) - 1  # Représente math.inf
+_MASK_64 = (1 << 64) - 1
+
+def _pack_score(score: float) -> int:
+    if score == math.inf:
+        score = _SCORE_INFINITY
+    elif score == -math.inf:
+        score = -_SCORE_INFINITY
+    return int(score) + _SCORE_OFFSET
+
+def _unpack_score(value: int) -> float:
+    score = value - _SCORE_OFFSET
+    if score == _SCORE_INFINITY:
+        return math.inf
+    if score == -_SCORE_INFINITY:
+        return -math.inf
+    return score
+
+class SharedTranspositionTable:
+    """Table de transposition en mémoire partagée, pour la recherche parallèle.
+
+    Même interface que ``TranspositionTable``. Les écritures ne sont pas
+    verrouillées : une entrée déchirée par deux écritures simultanées ne
+    vérifie plus clé ^ données et est ignorée à la lecture. La génération
+    est elle aussi en mémoire partagée : seul le processus principal
+    l'avance (``advance_generation``), ``new_search`` ne fait rien, pour que
+    tous les processus vieillissent les entrées de la même façon.
+    """
+
+    def __init__(self, size_mb: float = 16, name: Optional[str] = None):
+        # Import local : inutile (et coûteux) pour la recherche sur un seul cœur
+        from multiprocessing import shared_memory
+
+        count = max(1, int(size_mb * 1024 * 1024) // SHARED_ENTRY_BYTES)
+        self.size = 1 << (count.bit_length() - 1)
+        self.mask = self.size - 1
+        self.owner = name is None
+        table_bytes = self.size * SHARED_ENTRY_BYTES
+        if self.owner:
+            # Les entrées, puis la génération sur 64 bits
+            self.memory = shared_memory.SharedMemory(create=True, size=table_bytes + 8)
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+        self.slots = self.memory.buf[:table_bytes].cast("Q")
+        self._generation = self.memory.buf[table_bytes:table_bytes + 8].cast("Q")
+        if self.owner:
+            self.clear()
+        self.name = self.memory.name
+        self.hits = 0
+        self.probes = 0
+
+    @classmethod
+    def attach(cls, name: str, size_mb: float) -> "SharedTranspositionTable":
+        """Ouvre dans un processus de calcul la table créée par le processus principal"""
+        return cls(size_mb, name)
+
+    @property
+    def generation(self) -> int:
+        return self._generation[0]
+
+    def new_search(self):
+        """Sans effet : la génération commune est avancée par advance_generation"""
+
+    def advance_generation(self):
+        """Nouvelle recherche, à appeler par le processus principal avant de lancer les autres"""
+        self._generation[0] = (self._generation[0] + 1) & 0xFF
+
+    def clear(self):
+        self.memory.buf[:self.size * SHARED_ENTRY_BYTES + 8] = bytes(self.size * SHARED_ENTRY_BYTES + 8)
+
+    def probe(self, key: int) -> Optional[Tuple]:
+        self.probes += 1
+        index = (key & self.mask) * 2
+        data = self.slots[index + 1]
+        if data and self.slots[index] ^ data == key:
+            self.hits += 1
+            move = data >> 42
+            return (key, (data >> 34) & 0xFF, (data >> 32) & 3, _unpack_score(data & 0xFFFFFF),
+                    move - 1 if move else None, (data >> 24) & 0xFF)
+        return None
+
+    def store(self, key: int, depth: int, bound: int, score: float, move):
+        index = (key & self.mask) * 2
+        generation = self._generation[0]
+        old_data = self.slots[index + 1]
+        same_key = old_data and self.slots[index] ^ old_data == key
+        if (old_data and not same_key and ((old_data >> 24) & 0xFF) == generation
+                and depth < ((old_data >> 34) & 0xFF)):
+            return
+        if move is None and same_key:
+            packed_move = old_data >> 42
+        else:
+            packed_move = move + 1 if move is not None else 0
+        data = (packed_move << 42 | min(depth, 0xFF) << 34 | bound << 32
+                | generation << 24 | _pack_score(score))
+        self.slots[index] = (key ^ data) & _MASK_64
+        self.slots[index + 1] = data
+
+    def close(self):
+        """Libère la vue ; le processus créateur détruit aussi le segment"""
+        self.slots.release()
+        self._generation.release()
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()